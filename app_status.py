@@ -0,0 +1,69 @@
+# app_status.py
+
+import threading
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple, Optional, Tuple
+
+
+class StatusSnapshot(NamedTuple):
+    """
+    ある時点のアプリケーションの状態。作成後は変更しない。
+
+    versionは公開のたびに1ずつ増えるため、前回読み取ったversionと比べるだけで変化の有無がわかる。
+    """
+
+    version: int = 0
+    status: str = "初期化中..."
+    config: Mapping[str, Any] = MappingProxyType({})
+    full_schedule_for_ui: Tuple = ()
+    log_file_path: str = ""
+    next_task_time: str = "N/A"
+    pending_task_count: int = 0
+    running_process_count: int = 0
+    process_runs: Tuple = ()
+
+
+class StatusBoard:
+    """
+    StatusSnapshotを公開する掲示板。
+
+    更新のたびに新しいStatusSnapshotを作成し、参照を1つ差し替えて公開する（コピーオンライト）。
+    読み取り側はsnapshot()で現在のスナップショットを受け取るだけで、ロックもコピーも不要。
+    更新側のロックは、複数のスレッドからの更新が互いに上書きされないよう、差し替えの間だけ保持する。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = StatusSnapshot()
+
+    def snapshot(self) -> StatusSnapshot:
+        """現在のスナップショットを返す。"""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def changed_since(self, version: int) -> Optional[StatusSnapshot]:
+        """versionより新しいスナップショットが公開されていればそれを返し、変化がなければNoneを返す。"""
+        snapshot = self._snapshot
+        return snapshot if snapshot.version != version else None
+
+    def publish(self, **changes) -> StatusSnapshot:
+        """
+        指定した項目だけを変更したスナップショットを公開する。
+
+        リストはタプルに、辞書は読み取り専用のビューに変換して格納する。
+        渡したリスト・辞書は以後変更しないこと（辞書は複製せずに参照する）。
+
+        Returns:
+            StatusSnapshot: 公開したスナップショット
+        """
+        for name, value in changes.items():
+            if isinstance(value, list):
+                changes[name] = tuple(value)
+            elif isinstance(value, dict):
+                changes[name] = MappingProxyType(value)
+        with self._lock:
+            self._snapshot = self._snapshot._replace(version=self._snapshot.version + 1, **changes)
+            return self._snapshot
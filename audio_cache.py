@@ -0,0 +1,217 @@
+# audio_cache.py
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+from typing import Iterable, NamedTuple, Optional
+
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+class CacheEntry(NamedTuple):
+    """キャッシュ済みの1曲分のPCMデータの情報。"""
+
+    source_path: str
+    pcm_path: str
+    meta_path: str
+    pcm_bytes: int
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AudioCache:
+    """
+    MP3をデコードしたPCMデータをディスクに保存し、次回以降の再生でデコードを省くキャッシュ。
+
+    PCMデータはmixerの出力形式（周波数・ビット数・チャンネル数）のまま保存し、
+    再生時はmmapで読み込んでpygame.mixer.Soundを作成する。Soundは作成時にデータを複製するため、
+    再生中は1曲分のPCMデータがメモリ上に置かれる（省けるのはデコードの時間で、メモリ使用量は減らない）。
+    キャッシュの有効性は元ファイルの更新日時・サイズで判定し、これらが変わった場合のみ
+    SHA-256を比較する（内容が同じであればデコードし直さない）。
+    合計サイズがmax_bytesを超えた場合は、最後に使用した日時が古いものから削除する。
+    1曲でmax_bytesを超えるものはキャッシュしない（再生時はファイルからストリーミングする）。
+
+    mixerを使用するため、初期化済みのmixerと同じスレッド（AudioEngineのワーカー）から呼ぶこと。
+    pygameはAudioEngineが読み込んだものを使う（このモジュールの読み込み時にはpygameを読み込まない）。
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """
+        Args:
+            directory (str): キャッシュを保存するディレクトリ（なければ作成する）
+            max_bytes (int): キャッシュの合計サイズの上限（バイト）
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # max_bytesを超えるためキャッシュしなかったファイル: パス -> (mtime_ns, size)（何度もデコードしない）
+        self._oversized: dict = {}
+
+    def _paths(self, source_path: str):
+        key = hashlib.sha1(os.path.abspath(source_path).encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".pcm", base + ".json"
+
+    def lookup(self, source_path: str) -> Optional[CacheEntry]:
+        """
+        元ファイルに対応する有効なキャッシュを返す。ない場合・無効な場合はNone。
+
+        使用したキャッシュは最終使用日時を更新する（LRUでの削除順に使用）。
+        """
+        import pygame
+
+        pcm_path, meta_path = self._paths(source_path)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            stat = os.stat(source_path)
+            pcm_bytes = os.path.getsize(pcm_path)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("format") != list(pygame.mixer.get_init() or ()) or meta.get("pcm_bytes") != pcm_bytes:
+            return None
+        if meta.get("mtime_ns") != stat.st_mtime_ns or meta.get("size") != stat.st_size:
+            # 更新日時だけが変わった（内容は同じ）場合は、メタデータを更新してそのまま使う
+            if meta.get("sha256") != _file_sha256(source_path):
+                return None
+            meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            self._write_meta(meta_path, meta)
+
+        os.utime(meta_path)
+        return CacheEntry(source_path, pcm_path, meta_path, pcm_bytes)
+
+    def store(self, source_path: str) -> Optional[CacheEntry]:
+        """
+        元ファイルをデコードしてキャッシュに保存する。
+
+        Returns:
+            CacheEntry: 保存したキャッシュ
+            None: デコード結果がmax_bytesを超えるため保存しなかった場合
+
+        Raises:
+            OSError: 保存に失敗した場合
+            pygame.error: デコードに失敗した場合
+        """
+        import pygame
+
+        os.makedirs(self.directory, exist_ok=True)
+        pcm_path, meta_path = self._paths(source_path)
+        stat = os.stat(source_path)
+        raw = pygame.mixer.Sound(source_path).get_raw()
+        if len(raw) > self.max_bytes:
+            self._oversized[source_path] = (stat.st_mtime_ns, stat.st_size)
+            return None
+
+        # 書き込み途中のファイルが使われないよう、一時ファイルに書いてから置き換える
+        with open(pcm_path + ".tmp", "wb") as f:
+            f.write(raw)
+        os.replace(pcm_path + ".tmp", pcm_path)
+        meta = {
+            "source": os.path.abspath(source_path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": _file_sha256(source_path),
+            "format": list(pygame.mixer.get_init()),
+            "pcm_bytes": len(raw),
+        }
+        self._write_meta(meta_path, meta)
+        self.evict(keep=meta_path)
+        return CacheEntry(source_path, pcm_path, meta_path, len(raw))
+
+    def get(self, source_path: str) -> Optional[CacheEntry]:
+        """有効なキャッシュを返す。ない場合はデコードして保存する。max_bytesを超えるためキャッシュできない場合はNone。"""
+        with self._lock:
+            oversized = self._oversized.get(source_path)
+            if oversized is not None:
+                try:
+                    stat = os.stat(source_path)
+                except OSError:
+                    stat = None
+                if stat is not None and oversized == (stat.st_mtime_ns, stat.st_size):
+                    return None
+                del self._oversized[source_path]
+            entry = self.lookup(source_path)
+            if entry is None:
+                entry = self.store(source_path)
+            return entry
+
+    def load_sound(self, source_path: str):
+        """
+        キャッシュしたPCMデータからpygame.mixer.Soundを作成する。キャッシュがない場合は先にデコードする。
+
+        PCMデータはmmapで読み込み、Soundの作成時にメモリ上へ複製される（mmapはすぐに閉じる）。
+
+        Returns:
+            pygame.mixer.Sound: 再生可能なSound
+            None: max_bytesを超えるためキャッシュできない場合
+        """
+        import pygame
+
+        entry = self.get(source_path)
+        if entry is None:
+            return None
+        with open(entry.pcm_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return pygame.mixer.Sound(buffer=data)
+
+    def prewarm(self, source_paths: Iterable[str]) -> int:
+        """
+        指定したファイルをまとめてキャッシュする。失敗したファイルは無視する（再生時にもう一度試みる）。
+
+        Returns:
+            int: キャッシュ済みのファイル数
+        """
+        import pygame
+
+        count = 0
+        for source_path in dict.fromkeys(source_paths):
+            try:
+                if self.get(source_path) is not None:
+                    count += 1
+            except (OSError, pygame.error):
+                continue
+        return count
+
+    def evict(self, keep: Optional[str] = None):
+        """合計サイズがmax_bytes以下になるまで、最後に使用した日時が古いキャッシュから削除する。"""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            meta_path = os.path.join(self.directory, name)
+            pcm_path = meta_path[: -len(".json")] + ".pcm"
+            try:
+                entries.append((os.stat(meta_path).st_mtime_ns, meta_path, pcm_path, os.path.getsize(pcm_path)))
+            except OSError:
+                continue
+
+        total = sum(entry[3] for entry in entries)
+        for _, meta_path, pcm_path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if meta_path == keep:
+                continue
+            for path in (meta_path, pcm_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+    @staticmethod
+    def _write_meta(meta_path: str, meta: dict):
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(meta_path + ".tmp", meta_path)
@@ -0,0 +1,82 @@
+# benchmarks/fixtures.py
+
+import json
+import os
+import random
+from datetime import date, timedelta
+
+
+def write_holiday_csv(path: str, rows: int, encoding: str, start: date = date(2025, 1, 1), seed: int = 0):
+    """
+    休日リストCSVを生成する。各行は 'YYYY-MM-DD,名称' の形式で、名称には日本語を含める。
+
+    Args:
+        path (str): 出力先のパス
+        rows (int): 行数
+        encoding (str): 文字コード（'utf-8' または 'shift_jis'）
+        start (date): 最初の日付
+        seed (int): 乱数のシード
+    """
+    rng = random.Random(seed)
+    current = start
+    with open(path, "w", encoding=encoding, newline="") as f:
+        f.write("日付,名称\n")
+        for i in range(rows):
+            current += timedelta(days=rng.randint(1, 3))
+            f.write(f"{current.isoformat()},休業日{i}\n")
+
+
+def make_config(start: date, years: int, slots: int, holiday_list_path: str, task_type: str = "play_mp3") -> dict:
+    """
+    指定した期間・1日あたりのタスク数の設定データを生成する。
+
+    Args:
+        start (date): 開始日
+        years (int): 期間（年）
+        slots (int): 1日あたりのタスク数（最大86400）
+        holiday_list_path (str): 休日リストのパス
+        task_type (str): タスクタイプ
+
+    Returns:
+        dict: 設定データ
+    """
+    step = 86400 // slots
+    daily_schedules = []
+    for i in range(slots):
+        seconds = i * step
+        daily_schedules.append(
+            {
+                "time": f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}",
+                "task_type": task_type,
+                "task_path": f"track_{i % 10}.mp3",
+            }
+        )
+    end = date(start.year + years, start.month, start.day) - timedelta(days=1)
+    return {
+        "schedule_period": {"start_date": start.isoformat(), "end_date": end.isoformat()},
+        "holiday_list_path": holiday_list_path,
+        "daily_schedules": daily_schedules,
+    }
+
+
+def write_config(path: str, config: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+
+
+def prepare_fixtures(directory: str, holiday_rows: int, slots: int) -> dict:
+    """
+    ベンチマーク用のファイル一式を生成し、各ファイルのパスを返す。
+
+    Returns:
+        dict: {"holidays_utf8", "holidays_sjis", "config"} -> パス
+    """
+    paths = {
+        "holidays_utf8": os.path.join(directory, "holidays_utf8.csv"),
+        "holidays_sjis": os.path.join(directory, "holidays_sjis.csv"),
+        "config": os.path.join(directory, "config.json"),
+    }
+    write_holiday_csv(paths["holidays_utf8"], holiday_rows, "utf-8")
+    write_holiday_csv(paths["holidays_sjis"], holiday_rows, "shift_jis")
+    write_config(paths["config"], make_config(date(2025, 1, 1), 10, slots, "holidays_utf8.csv"))
+    return paths
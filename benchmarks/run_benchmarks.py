@@ -0,0 +1,274 @@
+# benchmarks/run_benchmarks.py
+"""
+スケジュール展開・休日リスト読込・設定読込・タスク起動遅延のベンチマーク。
+
+合成データ（10年間の期間、1日1000件のタスク、10000行の休日リストなど）を一時ディレクトリに生成して計測し、
+結果をJSONで出力する。--compareで過去の結果と比較し、悪化した項目があれば終了コード1で終了する。
+
+    python benchmarks/run_benchmarks.py --output bench_result.json
+    python benchmarks/run_benchmarks.py --compare bench_result.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fixtures import make_config, prepare_fixtures  # noqa: E402
+
+import schedule_calculator  # noqa: E402
+import schedule_numpy  # noqa: E402
+from config_loader import load_config  # noqa: E402
+from schedule_calculator import compile_schedule, iter_schedule, load_holiday_index, next_occurrence, read_holidays  # noqa: E402
+from task_dispatcher import TaskDispatcher  # noqa: E402
+from timer_queue import TimerQueue  # noqa: E402
+
+# 指標名の末尾で、値が小さいほど良いか大きいほど良いかを判定する
+LOWER_IS_BETTER = ("_seconds", "_bytes")
+HIGHER_IS_BETTER = ("_per_second",)
+
+
+def best_of(func, repeat: int) -> float:
+    """funcをrepeat回実行し、最短の実行時間（秒）を返す。"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def peak_memory(func) -> int:
+    """func実行中に確保されたメモリのピーク（バイト）を返す。"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def quiet(func):
+    """標準出力への表示（load_configなどのprint）を抑止してfuncを実行する関数を返す。"""
+
+    def wrapper(*args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def consume(iterable) -> int:
+    count = 0
+    for _ in iterable:
+        count += 1
+    return count
+
+
+def bench_holidays(paths: dict, repeat: int) -> dict:
+    results = {}
+    for key, label in (("holidays_utf8", "utf8"), ("holidays_sjis", "sjis")):
+        path = paths[key]
+        results[f"read_holidays_{label}_seconds"] = best_of(lambda: read_holidays(path), repeat)
+
+        def cold_load(path=path):
+            schedule_calculator._holiday_cache.clear()
+            load_holiday_index(path)
+
+        results[f"load_holiday_index_{label}_cold_seconds"] = best_of(cold_load, repeat)
+        load_holiday_index(path)
+        results[f"load_holiday_index_{label}_cached_seconds"] = best_of(lambda: load_holiday_index(path), repeat * 100)
+    return results
+
+
+def bench_config(paths: dict, repeat: int) -> dict:
+    base_path = os.path.dirname(paths["config"])
+    config = quiet(load_config)(paths["config"])
+    return {
+        "load_config_seconds": best_of(lambda: quiet(load_config)(paths["config"]), repeat),
+        "compile_schedule_seconds": best_of(lambda: compile_schedule(config, base_path), repeat),
+    }
+
+
+def bench_expansion(paths: dict, list_slots: int, repeat: int) -> dict:
+    base_path = os.path.dirname(paths["config"])
+    config = quiet(load_config)(paths["config"])
+    schedule = compile_schedule(config, base_path)
+    results = {}
+
+    # ストリーミング展開（10年 x 1日のタスク数）
+    count = consume(iter_schedule(schedule))
+    elapsed = best_of(lambda: consume(iter_schedule(schedule)), repeat)
+    results["iter_schedule_occurrences"] = count
+    results["iter_schedule_seconds"] = elapsed
+    results["iter_schedule_occurrences_per_second"] = count / elapsed if elapsed else 0.0
+    results["iter_schedule_peak_bytes"] = peak_memory(lambda: consume(iter_schedule(schedule)))
+
+    # リストとして全件を構築（calculate_schedule）。メモリ量が大きくなるためタスク数を絞る
+    list_config = make_config(datetime(2025, 1, 1).date(), 10, list_slots, config["holiday_list_path"])
+    list_count = len(schedule_calculator.calculate_schedule(list_config, base_path))
+    elapsed = best_of(lambda: schedule_calculator.calculate_schedule(list_config, base_path), repeat)
+    results["calculate_schedule_occurrences"] = list_count
+    results["calculate_schedule_seconds"] = elapsed
+    results["calculate_schedule_occurrences_per_second"] = list_count / elapsed if elapsed else 0.0
+    results["calculate_schedule_peak_bytes"] = peak_memory(
+        lambda: schedule_calculator.calculate_schedule(list_config, base_path)
+    )
+
+    # 次回のタスクの検索（期間内のランダムな日時）
+    rng = random.Random(0)
+    span = (schedule.end_date - schedule.start_date).days
+    queries = [
+        datetime.combine(schedule.start_date, datetime.min.time())
+        + timedelta(days=rng.randrange(span), seconds=rng.randrange(86400))
+        for _ in range(1000)
+    ]
+    elapsed = best_of(lambda: [next_occurrence(schedule, q) for q in queries], repeat)
+    results["next_occurrence_query_seconds"] = elapsed / len(queries)
+
+    # NumPyバックエンドによる一括生成（NumPyがない場合は計測しない）
+    if schedule_numpy.is_available():
+        count = len(schedule_numpy.occurrence_array(schedule))
+        elapsed = best_of(lambda: schedule_numpy.occurrence_array(schedule), repeat)
+        results["numpy_occurrence_array_occurrences"] = count
+        results["numpy_occurrence_array_seconds"] = elapsed
+        results["numpy_occurrence_array_occurrences_per_second"] = count / elapsed if elapsed else 0.0
+    return results
+
+
+def bench_firing_latency(events: int, interval: float) -> dict:
+    """TimerQueueとTaskDispatcherを実時間で動かし、予定時刻からの開始遅延を計測する。"""
+    lateness = []
+    done = threading.Event()
+
+    def on_complete(record):
+        lateness.append(record.lateness)
+        if len(lateness) == events:
+            done.set()
+
+    task = schedule_calculator.CompiledTask(0, datetime.now().time(), "run_exe", "noop", "noop")
+    dispatcher = TaskDispatcher({"run_exe": lambda occurrence: (True, "")}, on_complete=on_complete)
+    timer = TimerQueue()
+    start = datetime.now() + timedelta(seconds=0.2)
+    for i in range(events):
+        when = start + timedelta(seconds=i * interval)
+        timer.add(when, schedule_calculator.Occurrence(when, task))
+
+    def loop():
+        while True:
+            due = timer.wait_due()
+            if due is None:
+                return
+            for _, occurrence in due:
+                dispatcher.submit(occurrence)
+
+    thread = threading.Thread(target=loop, daemon=True)
+    thread.start()
+    done.wait(timeout=events * interval + 10)
+    timer.shutdown()
+    thread.join()
+    dispatcher.shutdown()
+
+    ordered = sorted(lateness)
+    return {
+        "firing_events": len(ordered),
+        "firing_lateness_mean_seconds": statistics.fmean(ordered),
+        "firing_lateness_p50_seconds": ordered[len(ordered) // 2],
+        "firing_lateness_p95_seconds": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "firing_lateness_max_seconds": ordered[-1],
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    前回の結果と比較し、threshold（割合）を超えて悪化した指標を返す。
+
+    Returns:
+        list: [(指標名, 前回の値, 今回の値), ...]
+    """
+    regressions = []
+    for name, old in baseline.get("results", {}).items():
+        new = current["results"].get(name)
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or old <= 0:
+            continue
+        if name.endswith(LOWER_IS_BETTER) and new > old * (1 + threshold):
+            regressions.append((name, old, new))
+        elif name.endswith(HIGHER_IS_BETTER) and new < old * (1 - threshold):
+            regressions.append((name, old, new))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="music_scheduler ベンチマーク")
+    parser.add_argument("--output", help="結果を書き出すJSONファイルのパス（省略時は標準出力）")
+    parser.add_argument("--compare", help="比較対象の結果JSONファイルのパス")
+    parser.add_argument("--threshold", type=float, default=0.25, help="悪化とみなす割合（既定値: 0.25）")
+    parser.add_argument("--repeat", type=int, default=3, help="各計測の繰り返し回数（最短値を採用）")
+    parser.add_argument("--slots", type=int, default=1000, help="ストリーミング展開での1日あたりのタスク数")
+    parser.add_argument("--list-slots", type=int, default=100, help="calculate_scheduleでの1日あたりのタスク数")
+    parser.add_argument("--holiday-rows", type=int, default=10000, help="休日リストの行数")
+    parser.add_argument("--firing-events", type=int, default=50, help="起動遅延の計測に使うイベント数")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = prepare_fixtures(directory, args.holiday_rows, args.slots)
+        results = {}
+        results.update(bench_holidays(paths, args.repeat))
+        results.update(bench_config(paths, args.repeat))
+        results.update(bench_expansion(paths, args.list_slots, args.repeat))
+        results.update(bench_firing_latency(args.firing_events, 0.02))
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": vars(args),
+        },
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for name, old, new in regressions:
+            print(f"悪化: {name}: {old:.6g} -> {new:.6g}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
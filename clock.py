@@ -0,0 +1,60 @@
+# clock.py
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class SystemClock:
+    """実時間の時計。通常運用ではこれを使用する。"""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+    def wait(self, condition: threading.Condition, timeout: Optional[float]):
+        """
+        conditionの通知を最大timeout秒待つ。conditionのロックを取得済みで呼ぶこと。
+
+        Args:
+            condition (threading.Condition): 待機するCondition
+            timeout (float, optional): 待機秒数。Noneの場合は通知されるまで待つ。
+        """
+        condition.wait(timeout)
+
+
+class VirtualClock:
+    """
+    シミュレーション用の仮想時計。
+
+    sleep()/wait()は実際には待機せず、待機した秒数だけ現在時刻を即座に進める。
+    シミュレーションはスケジューラのスレッド1本で実行する前提で、
+    待機中に他のスレッドから通知が来ることは想定しない。
+    """
+
+    def __init__(self, start: datetime):
+        self._now = start
+        self._lock = threading.Lock()
+
+    def now(self) -> datetime:
+        with self._lock:
+            return self._now
+
+    def advance(self, seconds: float):
+        """現在時刻をseconds秒進める。"""
+        with self._lock:
+            self._now += timedelta(seconds=max(seconds, 0.0))
+
+    def sleep(self, seconds: float):
+        self.advance(seconds)
+
+    def wait(self, condition: threading.Condition, timeout: Optional[float]):
+        if timeout is None:
+            raise RuntimeError("仮想時計では期限のない待機はできません。")
+        self.advance(timeout)
+
+
+SYSTEM_CLOCK = SystemClock()
@@ -0,0 +1,83 @@
+# file_watcher.py
+
+import logging
+import os
+import threading
+from typing import Callable, Iterable, List, Optional, Tuple
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    """ファイルの (更新日時, サイズ) を返す。ファイルがない場合はNone。"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """
+    ファイルの更新日時とサイズを一定間隔で確認し、変化があればコールバックを呼ぶ。
+
+    Windowsを含むどの環境でも動作するよう、OSの通知機能は使わずポーリングで監視する。
+    1回の確認はファイルごとのos.stat()のみで、ファイルの内容は読まない。
+    """
+
+    def __init__(self, paths: Iterable[str], on_change: Callable[[List[str]], None], interval_seconds: float = 5.0):
+        """
+        Args:
+            paths (Iterable[str]): 監視するファイルのパス
+            on_change (Callable[[List[str]], None]): 変化したファイルのパスのリストを受け取るコールバック。
+                監視スレッドから呼ばれる。
+            interval_seconds (float): 確認の間隔（秒）
+        """
+        self._on_change = on_change
+        self._interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._signatures = {path: _signature(path) for path in paths}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def set_paths(self, paths: Iterable[str]):
+        """監視対象を置き換える。引き続き監視するファイルの状態は保持する。"""
+        with self._lock:
+            self._signatures = {
+                path: self._signatures[path] if path in self._signatures else _signature(path) for path in paths
+            }
+
+    def check(self) -> List[str]:
+        """
+        監視対象を1回確認し、前回から変化したファイルのパスを返す。コールバックは呼ばない。
+        """
+        changed = []
+        with self._lock:
+            for path, previous in self._signatures.items():
+                current = _signature(path)
+                if current != previous:
+                    self._signatures[path] = current
+                    changed.append(path)
+        return changed
+
+    def start(self):
+        """監視スレッドを開始する。"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """監視スレッドを停止する。"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self._interval_seconds):
+            changed = self.check()
+            if changed:
+                try:
+                    self._on_change(changed)
+                except Exception:
+                    # コールバックのエラーで監視を止めない
+                    logging.exception("ファイルの変更の処理中にエラーが発生しました。")
@@ -0,0 +1,111 @@
+# log_pipeline.py
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+ROTATE_WHEN_VALUES = ("S", "M", "H", "D", "MIDNIGHT", "W0", "W1", "W2", "W3", "W4", "W5", "W6")
+
+# start_logging()で開始し、まだstop_logging()していないQueueListener
+_running_listeners: set = set()
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    ログレコードを整形せずにキューへ入れるQueueHandler。
+
+    標準のQueueHandlerは呼び出し元のスレッドでメッセージを整形するが、
+    同じプロセス内で処理するためレコードを複製せずにそのまま渡し、整形はすべて書き出し用のスレッドで行う。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _positive_int(value, default: int, name: str) -> int:
+    # 0はローテーションしない（backup_countが0の場合、RotatingFileHandlerはファイルを切り替えずに書き続ける）ため認めない
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        logging.warning("logging.%s '%s' は不正です。既定値 (%s) を使用します。", name, value, default)
+        return default
+    return value
+
+
+def build_file_handler(log_file_path: str, settings: dict) -> logging.Handler:
+    """
+    設定ファイルの "logging" セクションに従い、ローテーションするファイル出力のハンドラを作成する。
+
+    rotate_whenを指定した場合は時刻で、指定しない場合はファイルサイズでローテーションする。
+
+    Args:
+        log_file_path (str): ログファイルのパス
+        settings (dict): "logging" セクションの内容
+
+    Returns:
+        logging.Handler: ファイル出力のハンドラ
+    """
+    backup_count = _positive_int(settings.get("backup_count", DEFAULT_BACKUP_COUNT), DEFAULT_BACKUP_COUNT, "backup_count")
+    when = settings.get("rotate_when")
+    if when is not None:
+        if str(when).upper() in ROTATE_WHEN_VALUES:
+            return logging.handlers.TimedRotatingFileHandler(
+                log_file_path, when=str(when), backupCount=backup_count, encoding="utf-8"
+            )
+        logging.warning("logging.rotate_when '%s' は不正です。ファイルサイズでローテーションします。", when)
+    max_bytes = _positive_int(settings.get("max_bytes", DEFAULT_MAX_BYTES), DEFAULT_MAX_BYTES, "max_bytes")
+    return logging.handlers.RotatingFileHandler(log_file_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+
+
+def start_logging(
+    log_file_path: str, settings: Optional[dict] = None, level: int = logging.INFO
+) -> logging.handlers.QueueListener:
+    """
+    キュー経由の非同期ログ出力を開始する。
+
+    ルートロガーにはキューへ入れるだけのハンドラを設定し、ファイル・コンソールへの書き出しは
+    QueueListenerのスレッドで行う。キューは上限なしのため、ログを出力するスレッドがディスクや
+    コンソールの書き込みを待つことはない。終了時に残ったログはatexitで書き出す。
+
+    Args:
+        log_file_path (str): ログファイルのパス
+        settings (dict, optional): 設定ファイルの "logging" セクションの内容
+        level (int): ログレベル
+
+    Returns:
+        logging.handlers.QueueListener: 開始したQueueListener
+    """
+    # 設定値の警告もキュー経由で出力されるよう、先にルートロガーを設定する
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(level)
+
+    formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+    handlers = [build_file_handler(log_file_path, settings or {}), logging.StreamHandler(sys.stdout)]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _running_listeners.add(listener)
+    atexit.register(stop_logging, listener)
+    return listener
+
+
+def stop_logging(listener: logging.handlers.QueueListener):
+    """キューに残ったログを書き出してQueueListenerを停止する。複数回呼んでもよい。"""
+    if listener not in _running_listeners:
+        return
+    _running_listeners.discard(listener)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
@@ -1,20 +1,17 @@
 # main_app.py
 
+import argparse
 import logging
 import os
 import sys
 import time
-from datetime import datetime, date, timedelta
+from functools import partial
+from datetime import datetime, date, time as dt_time, timedelta
 import threading
-import copy
-
-# --- ★★★ アプリケーションの二重起動を防止するためのライブラリ ★★★ ---
-try:
-    from tendo import singleton
-except ImportError:
-    print("エラー: tendoライブラリが必要です。コマンドプロンプトで 'pip install tendo' を実行してください。")
-    sys.exit(1)
+from typing import Callable, NamedTuple, Optional
 
+# 起動時間の計測の開始時刻（自作モジュールの読み込み時間を含める）
+_IMPORT_STARTED = time.perf_counter()
 
 # --- 外部ライブラリ ---
 # pygameはGUI版で利用する可能性があるため、ここではtry-exceptを残しますが、
@@ -26,255 +23,777 @@ except ImportError:
 #     sys.exit(1)
 
 # --- 自作モジュール（task_executorは新しいものをインポート） ---
+# pygame・psutil・http.serverなど読み込みに時間がかかるものは、各モジュールで必要になった時点で読み込む
 try:
+    from app_status import StatusBoard
+    from audio_cache import DEFAULT_CACHE_MAX_BYTES, AudioCache
+    from clock import SYSTEM_CLOCK, VirtualClock
     from config_loader import load_config
-    from schedule_calculator import calculate_schedule
-    from task_executor import play_mp3_safely, run_exe
+    from file_watcher import FileWatcher
+    from log_pipeline import start_logging
+    from metrics import CONFIG_RELOADS, DEFAULT_METRICS_PORT, METRICS, SCHEDULE_COMPUTE, START_SKEW, MetricsServer
+    from schedule_calculator import TASK_TYPES, Occurrence, load_holiday_index
+    from schedule_set import MergedScheduleWindow, ScheduleSet, load_schedule_set
+    from startup_timing import StartupTimer
+    from task_dispatcher import FireRecord, TaskDispatcher, build_task_dispatcher
+    from task_executor import PLAY_POLICIES, ProcessRun, get_audio_engine, get_process_supervisor, run_exe, stage_exe
+    from timer_queue import TimerQueue
 except ImportError as e:
     print(f"エラー: 必要なモジュールファイルが見つかりません: {e.name}.py")
     sys.exit(1)
 
 # --- グローバル変数と状態管理 ---
-APP_STATUS = {
-    "status": "初期化中...",
-    "config": {},
-    "full_schedule_for_ui": [],
-    "log_file_path": "",
-    "next_task_time": "N/A",
-    "pending_task_count": 0,
-}
-status_lock = threading.Lock()
-
-
-def setup_logging(base_path: str):
+# 状態はスナップショットとして公開する。読み取り側はAPP_STATUS.snapshot()で参照する
+APP_STATUS = StatusBoard()
+STARTUP_TIMER = StartupTimer(started=_IMPORT_STARTED)
+
+
+def setup_logging(base_path: str, settings: dict = None):
+    """
+    ログ出力を開始する。ファイル・コンソールへの書き出しは専用のスレッドで行い、
+    スケジューラのスレッドがログの書き込みを待たないようにする。
+
+    Args:
+        base_path (str): ログファイルを置くディレクトリ
+        settings (dict, optional): 設定ファイルの "logging" セクションの内容
+    """
     log_file_path = os.path.join(base_path, "app.log")
-    with status_lock:
-        APP_STATUS["log_file_path"] = log_file_path
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-        handlers=[logging.FileHandler(log_file_path, encoding="utf-8"), logging.StreamHandler(sys.stdout)],
+    APP_STATUS.publish(log_file_path=log_file_path)
+    return start_logging(log_file_path, settings)
+
+
+# --- スケジューラ ---
+# タイマーキューにはタスク（Occurrence）のほか、以下の制御イベントを登録する
+EVENT_DAY_START = "day_start"  # 日の開始: 本日のタスクを読み込む
+EVENT_SCHEDULE_DISPLAY = "schedule_display"  # 今後のスケジュールを表示する
+EVENT_STOP = "stop"  # スケジューラを終了する（シミュレーションの終了時刻に使用）
+SCHEDULE_DISPLAY_TIME = dt_time(8, 0, 0)
+
+
+class PreRoll(NamedTuple):
+    """タスクの事前準備のイベント。実行時刻のpreroll_seconds秒前にタイマーキューから取り出される。"""
+
+    occurrence: Occurrence
+
+
+class ScheduleReload(NamedTuple):
+    """設定ファイル・休日リストの再読込結果。タイマーキュー経由でスケジューラスレッドに渡す。"""
+
+    config: dict
+    schedule_set: ScheduleSet
+
+
+def _format_task(task: Occurrence) -> str:
+    # 複数のスケジュールを動かしている場合は、スケジュールの名前を先頭に付ける
+    prefix = f"[{task.schedule_name}] " if task.schedule_name else ""
+    return f"{prefix}{task.datetime.strftime('%Y-%m-%d %H:%M:%S (%a)')} - {task.task_type}: {task.task_path}"
+
+
+class _TaskText:
+    """ログ出力時にだけ_format_task()で文字列化するためのラッパー。"""
+
+    __slots__ = ("task",)
+
+    def __init__(self, task: Occurrence):
+        self.task = task
+
+    def __str__(self) -> str:
+        return _format_task(self.task)
+
+
+def _pending_tasks(timer: TimerQueue) -> list:
+    """タイマーキューに登録済みのタスク（制御イベントを除く）を時刻順に返す。"""
+    return [item for _, item in timer.items() if isinstance(item, Occurrence)]
+
+
+def _has_pending_work(timer: TimerQueue) -> bool:
+    """未実行のタスク、または次の日の開始イベントが登録済みであればTrueを返す。"""
+    return any(isinstance(item, Occurrence) or item == EVENT_DAY_START for _, item in timer.items())
+
+
+def _update_status(timer: TimerQueue, status: str) -> list:
+    pending = _pending_tasks(timer)
+    # Occurrenceは変更できないタプルのため、複製せずにそのまま公開できる
+    APP_STATUS.publish(
+        full_schedule_for_ui=pending,
+        status=status,
+        pending_task_count=len(pending),
+        next_task_time=pending[0].datetime.strftime("%Y-%m-%d %H:%M:%S (%a)") if pending else "なし",
+    )
+    return pending
+
+
+def _display_upcoming_schedule(window: MergedScheduleWindow, now: datetime):
+    # 現在時刻より後のタスクを先頭から最大30件だけ取得する（期間全体は計算しない）
+    started = time.perf_counter()
+    upcoming_tasks = window.upcoming(now, 30)
+    SCHEDULE_COMPUTE.observe(time.perf_counter() - started, "display")
+    logging.info("今後のスケジュールを %d 件計算しました。", len(upcoming_tasks))
+
+    if upcoming_tasks:
+        logging.info("--- 今後のスケジュール (今後30件を表示) ---")
+        for i, task in enumerate(upcoming_tasks):
+            logging.info("  %02d. %s", i + 1, _TaskText(task))
+        logging.info("-----------------------------------------")
+    else:
+        logging.info("今後のスケジュールはありません。")
+
+
+def _queue_task(timer: TimerQueue, task: Occurrence, now: datetime, preroll_seconds: float):
+    """タスクをタイマーキューに登録する。事前準備を行う場合は、実行時刻の前に準備のイベントも登録する。"""
+    timer.add(task.datetime, task)
+    if preroll_seconds > 0:
+        timer.add(max(task.datetime - timedelta(seconds=preroll_seconds), now), PreRoll(task))
+
+
+def _start_day(
+    window: MergedScheduleWindow,
+    timer: TimerQueue,
+    now: datetime,
+    preroll_seconds: float = 0.0,
+    since: Optional[datetime] = None,
+):
+    """
+    本日の未実行タスクをタイマーキューに登録し、8:00のスケジュール表示を予約する。
+
+    sinceには日の開始イベントの予定時刻を渡す。予定時刻と同時刻（0:00:00など）以降のタスクを登録するため、
+    イベントの処理が予定時刻より遅れても、その間に実行時刻を迎えたタスクは失われない。
+    省略した場合は現在時刻より後のタスクのみを登録する。
+    """
+    current_date = now.date()
+
+    # 毎朝8:00に今後のスケジュールを表示
+    if now.time() >= SCHEDULE_DISPLAY_TIME:
+        _display_upcoming_schedule(window, now)
+    else:
+        timer.add(datetime.combine(current_date, SCHEDULE_DISPLAY_TIME), EVENT_SCHEDULE_DISPLAY)
+
+    started = time.perf_counter()
+    if since is None:
+        tasks_for_today = window.for_day(current_date, now)
+    else:
+        tasks_for_today = window.for_day(current_date, since, inclusive=True)
+    SCHEDULE_COMPUTE.observe(time.perf_counter() - started, "day_start")
+    logging.info("本日 (%s) のスケジュールは %d 件です。", current_date, len(tasks_for_today))
+
+    for task in tasks_for_today:
+        _queue_task(timer, task, now, preroll_seconds)
+
+    # ログ出力の前に、未実行タスクの件数を更新
+    pending = _update_status(timer, "監視中")
+
+    logging.info("本日 (%s) の未実行タスク: %d件。", current_date, len(pending))
+    if pending:
+        logging.info("次回のスケジュール: %s", _TaskText(pending[0]))
+
+
+def _task_key(task: Occurrence) -> tuple:
+    """再読込の前後で同じ実行かどうかを判定するためのキー。"""
+    return task.datetime, task.schedule_name, task.task_type, task.resolved_path
+
+
+def _apply_schedule_reload(
+    reload: ScheduleReload, timer: TimerQueue, now: datetime, preroll_seconds: float = 0.0
+) -> MergedScheduleWindow:
+    """
+    再読込したスケジュールと、タイマーキューに登録済みの本日のタスクとの差分だけを反映する。
+
+    変わらないタスクは登録されたまま残すため、再読込の最中に実行時刻を迎えたタスクも失われない。
+    実行時刻を過ぎたタスク（これから実行されるもの）には手を付けない。
+
+    Returns:
+        MergedScheduleWindow: 新しいスケジュールのウィンドウ
+    """
+    started = time.perf_counter()
+    window = MergedScheduleWindow(reload.schedule_set.schedules, now)
+    new_tasks = {_task_key(task): task for task in window.for_day(now.date(), now)}
+    SCHEDULE_COMPUTE.observe(time.perf_counter() - started, "reload")
+    old_keys = {_task_key(task) for task in _pending_tasks(timer)}
+
+    removed = timer.remove_where(
+        lambda when, item: when > now and isinstance(item, Occurrence) and _task_key(item) not in new_tasks
     )
+    timer.remove_where(lambda when, item: isinstance(item, PreRoll) and _task_key(item.occurrence) not in new_tasks)
+    added = 0
+    for key, task in new_tasks.items():
+        if key not in old_keys:
+            _queue_task(timer, task, now, preroll_seconds)
+            added += 1
+    # 次回のタスクがある日は変わりうるため、日の開始イベントを登録し直す。
+    # 本日の未実行タスクがない（待機中の）場合は、終了の表示を繰り返さないようここで登録する
+    timer.remove_where(lambda when, item: when > now and item == EVENT_DAY_START)
+    if not _pending_tasks(timer):
+        _schedule_next_day(window, timer, now)
+
+    APP_STATUS.publish(config=reload.config)
+    pending = _update_status(timer, "監視中" if _pending_tasks(timer) else "本日のスケジュール完了、待機中")
+    logging.info("設定を再読込しました。本日のタスク: 追加 %d件, 削除 %d件, 未実行 %d件。", added, removed, len(pending))
+    return window
+
+
+def _wait_for_next_day(window: MergedScheduleWindow, timer: TimerQueue, now: datetime) -> bool:
+    """
+    本日のタスクがすべて終わった後、次回のタスクがある日の開始時刻に日の開始イベントを予約する。
+
+    Returns:
+        bool: 次回のタスクがある場合True、すべてのスケジュールが終了した場合False
+    """
+    APP_STATUS.publish(status="本日のスケジュール完了、待機中")
+    logging.info("========================================")
+    logging.info("本日のスケジュールは、終了しました。")
+    logging.info("明日のスケジュールまでこのまま待機します。")
+    logging.info("========================================")
+
+    next_task = _schedule_next_day(window, timer, now)
+    if next_task is None:
+        logging.info("========================================")
+        logging.info("すべてのスケジュールが終了しました。アプリケーションを終了します。")
+        logging.info("========================================")
+        return False
+
+    logging.info("次回のスケジュール(%s)まで待機します。", _TaskText(next_task))
+    return True
+
+
+def _schedule_next_day(window: MergedScheduleWindow, timer: TimerQueue, now: datetime) -> Optional[Occurrence]:
+    """
+    次回のタスクがある日の開始時刻に日の開始イベントを登録する（ログは出力しない）。
+
+    Returns:
+        Occurrence: 次回のタスク
+        None: すべてのスケジュールが終了した場合（イベントは登録しない）
+    """
+    started = time.perf_counter()
+    next_task = window.next_after(now)
+    SCHEDULE_COMPUTE.observe(time.perf_counter() - started, "next_day")
+    if next_task is not None:
+        timer.add(datetime.combine(next_task.datetime.date(), datetime.min.time()), EVENT_DAY_START)
+    return next_task
+
+
+# --- タスクの実行 ---
+# タスクパスはcompile_schedule()でbase_pathに基づき解決済み
+def _report_start_skew(task: Occurrence, started_at: datetime):
+    """実行時刻から実際に再生・起動した時刻までの誤差を記録する。"""
+    skew = (started_at - task.datetime).total_seconds()
+    START_SKEW.observe(skew, task.task_type)
+    logging.info("開始時刻の誤差: %+.3f秒 -> [%s] %s", skew, task.task_type, task.task_path)
+
+
+def _run_play_mp3(task: Occurrence, clock=SYSTEM_CLOCK) -> (bool, str):
+    # 再生はオーディオエンジンのワーカーで行い、ディスパッチャのワーカーは再生終了を待つ
+    engine = get_audio_engine()
+    return engine.play(task.resolved_path, on_start=lambda: _report_start_skew(task, clock.now())).result()
+
+
+def _run_exe(task: Occurrence, clock=SYSTEM_CLOCK) -> (bool, str):
+    success, message = run_exe(task.resolved_path)
+    if success:
+        _report_start_skew(task, clock.now())
+    APP_STATUS.publish(running_process_count=get_process_supervisor().running_count())
+    return success, message
+
+
+def _stage_play_mp3(task: Occurrence) -> (bool, str):
+    # 準備の完了は待たない（オーディオエンジンのワーカーが再生の前に処理する）
+    get_audio_engine().stage(task.resolved_path)
+    return True, "再生の準備を開始しました。"
+
+
+def _stage_exe(task: Occurrence) -> (bool, str):
+    return stage_exe(task.resolved_path)
+
+
+def build_task_runners(clock=SYSTEM_CLOCK) -> dict:
+    """
+    タスクタイプごとの実行関数を返す。
 
+    開始時刻の誤差は、ディスパッチャが遅延の計測に使う時計と同じclockで計測する（両者を比較できるように）。
+    """
+    return {"play_mp3": partial(_run_play_mp3, clock=clock), "run_exe": partial(_run_exe, clock=clock)}
 
-# --- スケジューラループ ---
-def scheduler_loop(config, base_path):
-    last_checked_date = None
-    last_schedule_display_date = None  # スケジュール表示の最終日付
-    tasks_for_today = []
+
+TASK_STAGERS = {"play_mp3": _stage_play_mp3, "run_exe": _stage_exe}
+
+
+def _log_fire_record(record: FireRecord):
+    task = record.occurrence
+    if record.outcome != "executed":
+        if task.task_type == "play_mp3":
+            # 再生しないため、事前準備したSoundを解放する
+            get_audio_engine().unstage(task.resolved_path)
+        logging.warning(
+            "タスクを実行しませんでした (%.3f秒遅延) -> [%s] %s: %s",
+            record.lateness,
+            task.task_type,
+            task.task_path,
+            record.message,
+        )
+        return
+    logging.info(
+        "タスク実行結果 (%.3f秒遅延で開始) -> [%s] %s: %s", record.lateness, task.task_type, task.task_path, record.message
+    )
+    if not record.success:
+        logging.error("タスク実行でエラーが発生しました。")
+
+
+def _log_process_run(run: ProcessRun):
+    summary = "%s (PID %s, 終了コード %s, 実行時間 %.1f秒"
+    args = [run.file_path, run.pid, run.returncode, run.runtime]
+    if run.cpu_seconds is not None:
+        summary += ", CPU時間 %.2f秒"
+        args.append(run.cpu_seconds)
+    if run.peak_rss is not None:
+        summary += ", 最大メモリ %.1fMB"
+        args.append(run.peak_rss / (1024 * 1024))
+    summary += ")"
+    if run.timed_out:
+        logging.warning("制限時間を超えたためプログラムを強制終了しました: " + summary, *args)
+    else:
+        logging.info("プログラムが終了しました: " + summary, *args)
+
+    supervisor = get_process_supervisor()
+    APP_STATUS.publish(running_process_count=supervisor.running_count(), process_runs=supervisor.recent_runs())
+
+
+def _execute_task(task: Occurrence, timer: TimerQueue, dispatcher: TaskDispatcher):
+    # --- 実行時刻に到達 ---
+    APP_STATUS.publish(status=f"実行中: {task.task_type}")
+    logging.info("実行時刻です。タスクを実行 -> [%s] %s", task.task_type, task.task_path)
+
+    # 実行はタスクタイプごとのワーカーで行い、結果は_log_fire_recordで記録する
+    dispatcher.submit(task)
+
+    # --- 実行後処理 ---
+    pending = _update_status(timer, "監視中")
+    if pending:
+        logging.info("次回のスケジュール: %s", _TaskText(pending[0]))
+    else:
+        logging.info("本日の残りのスケジュールはありません。")
+
+
+def scheduler_loop(
+    schedule_set: ScheduleSet, timer: TimerQueue, dispatcher: TaskDispatcher, on_ready: Optional[Callable[[], None]] = None
+):
+    """
+    タイマーキューで次の期限まで待機し、期限に達したタスク・制御イベントを処理する。
+
+    すべてのスケジュールのタスクを1つのタイマーキューに登録するため、
+    スケジュールの数に関係なく、起床するのは次の期限の時刻だけとなる。
+
+    1秒ごとのポーリングは行わず、次の期限（またはタイマーキューへの変更）で起床する。
+    タスクの実行はdispatcherに任せ、完了を待たずに次の期限の待機に戻る。
+    timer.shutdown()が呼ばれると待機を中断して終了する。
+
+    現在時刻はtimer.clockから取得するため、VirtualClockを渡せば仮想時間で動作する。
+    on_readyを指定した場合は、本日のタスクを登録して最初の待機に入る直前に1回だけ呼び出す。
+    """
+    clock = timer.clock
+    # スケジュールのウィンドウは起動時に一度だけ作成し、以降は日付の経過に合わせて延長する
+    window = MergedScheduleWindow(schedule_set.schedules, clock.now())
+    timer.add(clock.now(), EVENT_DAY_START)
 
     while True:
+        due = timer.wait_due()
+        if due is None:
+            logging.info("スケジューラを停止しました。")
+            return
+
         try:
-            now = datetime.now()
-            current_date = now.date()
-            current_time = now.time()
-
-            # 毎朝8:00に今後のスケジュールを表示
-            if current_time >= datetime.strptime("08:00:00", "%H:%M:%S").time() and (
-                last_schedule_display_date is None or current_date > last_schedule_display_date
-            ):
-                # 今後1年間のスケジュールを計算
-                temp_config_for_future = copy.deepcopy(config)
-                temp_config_for_future["schedule_period"]["start_date"] = current_date.strftime("%Y-%m-%d")
-                original_end_date_str = config["schedule_period"]["end_date"]
-                original_end_date = datetime.strptime(original_end_date_str, "%Y-%m-%d").date()
-                one_year_later_date = current_date + timedelta(days=365)
-                display_end_date = min(original_end_date, one_year_later_date)
-                temp_config_for_future["schedule_period"]["end_date"] = display_end_date.strftime("%Y-%m-%d")
-
-                future_schedule = calculate_schedule(temp_config_for_future, base_path)
-                logging.info(f"今後のスケジュールを {len(future_schedule)} 件計算しました。")
-                future_schedule.sort(key=lambda x: x["datetime"])
-
-                # 現在時刻より後のタスクのみを抽出し、最大30件表示
-                upcoming_tasks = [t for t in future_schedule if t["datetime"] > now][:30]
-
-                if upcoming_tasks:
-                    logging.info("--- 今後のスケジュール (今後30件を表示) ---")
-                    for i, task in enumerate(upcoming_tasks):
-                        logging.info(
-                            f"  {i + 1:02d}. {task['datetime'].strftime('%Y-%m-%d %H:%M:%S (%a)')} - {task['task_type']}: {task['task_path']}"
-                        )
-                    logging.info("-----------------------------------------")
-                else:
-                    logging.info("今後のスケジュールはありません。")
-
-                last_schedule_display_date = current_date
-
-            if last_checked_date is None or current_date > last_checked_date:
-                temp_config = copy.deepcopy(config)
-                temp_config["schedule_period"]["start_date"] = current_date.strftime("%Y-%m-%d")
-                temp_config["schedule_period"]["end_date"] = current_date.strftime("%Y-%m-%d")
-
-                tasks_for_today = calculate_schedule(temp_config, base_path)
-                logging.info(f"本日 ({current_date}) のスケジュールは {len(tasks_for_today)} 件です。")
-                tasks_for_today.sort(key=lambda x: x["datetime"])
-
-                tasks_for_today = [t for t in tasks_for_today if t["datetime"] > now]
-
-                # ログ出力の前に、未実行タスクの件数を更新
-                with status_lock:
-                    APP_STATUS["full_schedule_for_ui"] = copy.deepcopy(tasks_for_today)
-                    APP_STATUS["status"] = "監視中"
-                    APP_STATUS["pending_task_count"] = len(tasks_for_today)
-                    APP_STATUS["next_task_time"] = (
-                        tasks_for_today[0]["datetime"].strftime("%Y-%m-%d %H:%M:%S (%a)") if tasks_for_today else "なし"
-                    )
-
-                logging.info(f"本日 ({current_date}) の未実行タスク: {len(tasks_for_today)}件。")
-                if tasks_for_today:
-                    next_task_info = tasks_for_today[0]
-                    logging.info(
-                        f"次回のスケジュール: {next_task_info['datetime'].strftime('%Y-%m-%d %H:%M:%S (%a)')} - {next_task_info['task_type']}: {next_task_info['task_path']}"
-                    )
-                # tasks_for_todayが空の場合、「タスクはありません」というログは件数0のログでカバーされるため、ここでは追加しない。
-                last_checked_date = current_date
-
-            if not tasks_for_today:
-                with status_lock:
-                    APP_STATUS["status"] = "本日のスケジュール完了、待機中"
-                # 待機中のログは一度だけ出力し、その後は日付が変わるまで出力しない
-                if last_checked_date != current_date:  # 日付が変わった場合のみログを出力
-                    logging.info("========================================")
-                    logging.info("本日のスケジュールは、終了しました。")
-                    logging.info("明日のスケジュールまでこのまま待機します。")
-                    logging.info("========================================")
-
-                # 次回のスケジュールまで待機
-                # 今後のスケジュールを再計算し、最初のタスク時刻を取得
-                temp_config_for_future = copy.deepcopy(config)
-                temp_config_for_future["schedule_period"]["start_date"] = current_date.strftime("%Y-%m-%d")
-                original_end_date_str = config["schedule_period"]["end_date"]
-                original_end_date = datetime.strptime(original_end_date_str, "%Y-%m-%d").date()
-                one_year_later_date = current_date + timedelta(days=365)
-                display_end_date = min(original_end_date, one_year_later_date)
-                temp_config_for_future["schedule_period"]["end_date"] = display_end_date.strftime("%Y-%m-%d")
-
-                future_schedule = calculate_schedule(temp_config_for_future, base_path)
-                future_schedule.sort(key=lambda x: x["datetime"])
-
-                # 現在時刻より後のタスクのみを抽出
-                upcoming_tasks = [t for t in future_schedule if t["datetime"] > now]
-
-                if upcoming_tasks:
-                    next_task_datetime = upcoming_tasks[0]["datetime"]
-                    sleep_seconds = (next_task_datetime - now).total_seconds()
-                    if sleep_seconds > 0:
-                        logging.info(
-                            f"次回のスケジュール({next_task_datetime.strftime('%Y-%m-%d %H:%M:%S (%a)')})まで待機します。"
-                        )
-                        time.sleep(sleep_seconds)
-                    else:
-                        # すでに次回のスケジュール時刻を過ぎている場合、短い時間待機して次のループで再評価
-                        time.sleep(1)  # 1秒待機
+            for when, item in due:
+                if item == EVENT_STOP:
+                    return
+                elif item == EVENT_DAY_START:
+                    _start_day(window, timer, clock.now(), dispatcher.preroll_seconds, since=when)
+                elif item == EVENT_SCHEDULE_DISPLAY:
+                    _display_upcoming_schedule(window, clock.now())
+                elif isinstance(item, ScheduleReload):
+                    window = _apply_schedule_reload(item, timer, clock.now(), dispatcher.preroll_seconds)
+                elif isinstance(item, PreRoll):
+                    dispatcher.stage(item.occurrence)
                 else:
-                    # 今後のスケジュールがない場合、アプリケーションを終了
-                    logging.info("========================================")
-                    logging.info("すべてのスケジュールが終了しました。アプリケーションを終了します。")
-                    logging.info("========================================")
-                    sys.exit(0)  # アプリケーションを終了
-                continue
-
-            next_task = tasks_for_today[0]
-
-            if now < next_task["datetime"]:
-                time.sleep(1)
-                continue
-
-            # --- 実行時刻に到達 ---
-            with status_lock:
-                APP_STATUS["status"] = f"実行中: {next_task['task_type']}"
-            logging.info(f"実行時刻です。タスクを実行 -> [{next_task['task_type']}] {next_task['task_path']}")
-
-            executed_task = tasks_for_today.pop(0)  # 実行したタスクをリストから削除
-
-            success, message = False, ""
-            # タスクパスが絶対パスでない場合、base_pathと結合してフルパスを生成
-            # config.jsonに相対パスで記述されたファイルに対応するため
-            resolved_task_path = (
-                os.path.join(base_path, executed_task["task_path"])
-                if not os.path.isabs(executed_task["task_path"])
-                else executed_task["task_path"]
+                    _execute_task(item, timer, dispatcher)
+
+            if not _has_pending_work(timer) and not _wait_for_next_day(window, timer, clock.now()):
+                return
+            if on_ready is not None:
+                on_ready()
+                on_ready = None
+        except Exception as e:
+            logging.critical("ループで致命的エラー: %s", e, exc_info=True)
+            APP_STATUS.publish(status="エラー発生")
+            clock.sleep(5)
+            if not _has_pending_work(timer):
+                timer.add(clock.now(), EVENT_DAY_START)
+
+
+def configure_audio_engine(config: dict, base_path: str, schedule_set: ScheduleSet):
+    """
+    設定ファイルの "audio" セクションをAudioEngineに反映する。不正な値は既定値として扱う。
+
+    キャッシュが有効な場合は、スケジュールで再生するMP3のデコードをバックグラウンドで開始する。
+    """
+    engine = get_audio_engine()
+    audio_config = config.get("audio", {})
+    audio_policy = audio_config.get("overlap_policy", "queue")
+    if audio_policy not in PLAY_POLICIES:
+        logging.warning(f"audio.overlap_policy '{audio_policy}' は不正です。'queue' として扱います。")
+        audio_policy = "queue"
+    engine.default_policy = audio_policy
+
+    cache_config = audio_config.get("cache", {})
+    if not cache_config.get("enabled", True):
+        engine.cache = None
+        return
+    max_bytes = cache_config.get("max_bytes", DEFAULT_CACHE_MAX_BYTES)
+    if isinstance(max_bytes, bool) or not isinstance(max_bytes, int) or max_bytes < 0:
+        logging.warning(f"audio.cache.max_bytes '{max_bytes}' は不正です。既定値を使用します。")
+        max_bytes = DEFAULT_CACHE_MAX_BYTES
+    directory = os.path.join(base_path, cache_config.get("directory", "audio_cache"))
+    engine.cache = AudioCache(directory, max_bytes)
+
+    tracks = [
+        task.resolved_path for schedule in schedule_set.schedules for task in schedule.tasks if task.task_type == "play_mp3"
+    ]
+    engine.prewarm(tracks).add_done_callback(
+        lambda f: logging.info("音声のキャッシュを準備しました (%d件)。", f.result()) if f.result() else None
+    )
+
+
+def configure_process_supervisor(config: dict):
+    """設定ファイルの "run_exe" セクションをProcessSupervisorに反映する。不正な値は無視する。"""
+    supervisor = get_process_supervisor()
+    run_exe_config = config.get("run_exe", {})
+
+    timeout_seconds = run_exe_config.get("timeout_seconds")
+    if timeout_seconds is not None and (
+        isinstance(timeout_seconds, bool) or not isinstance(timeout_seconds, (int, float)) or timeout_seconds <= 0
+    ):
+        logging.warning(f"run_exe.timeout_seconds '{timeout_seconds}' は不正です。制限なしとして扱います。")
+        timeout_seconds = None
+
+    max_running = run_exe_config.get("max_running")
+    if max_running is not None and (isinstance(max_running, bool) or not isinstance(max_running, int) or max_running < 1):
+        logging.warning(f"run_exe.max_running '{max_running}' は不正です。制限なしとして扱います。")
+        max_running = None
+
+    supervisor.timeout_seconds = timeout_seconds
+    supervisor.max_running = max_running
+    supervisor.on_exit = _log_process_run
+
+
+# --- 設定ファイルの再読込 ---
+# 再読込では反映されず、再起動が必要な設定ファイルのセクション
+RESTART_REQUIRED_SECTIONS = ("executor", "logging", "metrics", "hot_reload")
+
+
+def _reload_files(config_path: str, base_path: str, timer: TimerQueue, watcher: FileWatcher, changed: list):
+    """
+    設定ファイル・休日リストの変更を検知した際に呼ばれる（監視スレッド）。
+
+    設定を読み込み直して検証し、問題なければスケジューラスレッドに反映を依頼する。
+    読み込みに失敗した場合は、現在のスケジュールのまま動作を続ける。
+    """
+    logging.info("ファイルの変更を検知しました: %s", ", ".join(changed))
+    try:
+        config = load_config(config_path)
+        started = time.perf_counter()
+        schedule_set = load_schedule_set(config, config_path) if config else None
+    except Exception:
+        logging.exception("設定の再読込中にエラーが発生しました。")
+        schedule_set = None
+    if schedule_set is None:
+        CONFIG_RELOADS.inc("failure")
+        logging.error("設定の再読込に失敗しました。現在のスケジュールのまま動作を続けます。")
+        return
+    SCHEDULE_COMPUTE.observe(time.perf_counter() - started, "compile")
+    CONFIG_RELOADS.inc("success")
+
+    previous = APP_STATUS.snapshot().config
+    for section in RESTART_REQUIRED_SECTIONS:
+        if config.get(section) != previous.get(section):
+            logging.warning("設定ファイルの '%s' の変更は、アプリケーションの再起動後に反映されます。", section)
+
+    configure_audio_engine(config, base_path, schedule_set)
+    configure_process_supervisor(config)
+    watcher.set_paths(schedule_set.watch_paths)
+    timer.add(timer.clock.now(), ScheduleReload(config, schedule_set))
+
+
+def start_file_watcher(config_path: str, base_path: str, schedule_set: ScheduleSet, timer: TimerQueue, config: dict):
+    """
+    設定ファイルの "hot_reload" セクションに従い、すべての設定ファイルと休日リストの監視を開始する。
+
+    Returns:
+        FileWatcher: 監視を開始したFileWatcher（無効の場合はNone）
+    """
+    reload_config = config.get("hot_reload", {})
+    if not reload_config.get("enabled", True):
+        return None
+    interval = reload_config.get("interval_seconds", 5)
+    if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval <= 0:
+        logging.warning(f"hot_reload.interval_seconds '{interval}' は不正です。5秒として扱います。")
+        interval = 5
+
+    watcher = FileWatcher(
+        schedule_set.watch_paths,
+        lambda changed: _reload_files(config_path, base_path, timer, watcher, changed),
+        interval_seconds=interval,
+    )
+    watcher.start()
+    return watcher
+
+
+# --- 計測値の出力 ---
+def _status_gauges() -> dict:
+    snapshot = APP_STATUS.snapshot()
+    return {
+        "scheduler_pending_tasks": ("本日の未実行タスク数", snapshot.pending_task_count),
+        "scheduler_running_processes": ("実行中のプログラム数", snapshot.running_process_count),
+        "scheduler_status_version": ("状態の更新回数", snapshot.version),
+    }
+
+
+def _status_document() -> dict:
+    """/status で返す、現在のStatusSnapshotのJSON表現。"""
+    snapshot = APP_STATUS.snapshot()
+    return {
+        "version": snapshot.version,
+        "status": snapshot.status,
+        "next_task_time": snapshot.next_task_time,
+        "pending_task_count": snapshot.pending_task_count,
+        "running_process_count": snapshot.running_process_count,
+        "log_file_path": snapshot.log_file_path,
+        "pending_tasks": [
+            {
+                "schedule": task.schedule_name,
+                "datetime": task.datetime.isoformat(),
+                "task_type": task.task_type,
+                "task_path": task.task_path,
+            }
+            for task in snapshot.full_schedule_for_ui
+        ],
+        "process_runs": [run._asdict() for run in snapshot.process_runs],
+        "startup": STARTUP_TIMER.to_dict(),
+    }
+
+
+def start_metrics_server(config: dict):
+    """
+    設定ファイルの "metrics" セクションに従い、計測値を返すHTTPサーバーを開始する。
+
+    待ち受けは127.0.0.1のみで、同じPCからしかアクセスできない。
+
+    Returns:
+        MetricsServer: 開始したサーバー（無効の場合・開始できなかった場合はNone）
+    """
+    metrics_config = config.get("metrics", {})
+    if not metrics_config.get("enabled", True):
+        return None
+    port = metrics_config.get("port", DEFAULT_METRICS_PORT)
+    if isinstance(port, bool) or not isinstance(port, int) or not 0 <= port <= 65535:
+        logging.warning(f"metrics.port '{port}' は不正です。{DEFAULT_METRICS_PORT}として扱います。")
+        port = DEFAULT_METRICS_PORT
+
+    try:
+        server = MetricsServer(status_source=_status_document, port=port)
+    except OSError as e:
+        logging.warning("計測値の出力を開始できませんでした (ポート %d): %s", port, e)
+        return None
+    METRICS.add_gauge_source(_status_gauges)
+    server.start()
+    return server
+
+
+# --- シミュレーション ---
+def _simulated_run(task: Occurrence) -> (bool, str):
+    return True, "シミュレーションのため実行していません。"
+
+
+def run_simulation(config: dict, base_path: str, start: datetime, end: datetime) -> list:
+    """
+    仮想時計でstartからendまでのスケジューラの動作を再現し、実行記録を返す。
+
+    スケジューラの処理（scheduler_loop）はそのまま使い、待機は仮想時計で即座に進める。
+    タスクは実際には実行せず、実行されたものとして記録する。
+
+    Args:
+        config (dict): 設定データ
+        base_path (str): 相対パスを解決する基準ディレクトリ
+        start (datetime): シミュレーションの開始日時
+        end (datetime): シミュレーションの終了日時
+
+    Returns:
+        list: FireRecordのリスト（実行順）
+    """
+    schedule_set = load_schedule_set(config, os.path.join(base_path, "config.json"))
+    if schedule_set is None:
+        return []
+
+    clock = VirtualClock(start)
+    fires = []
+    runners = {task_type: _simulated_run for task_type in TASK_TYPES}
+    dispatcher = build_task_dispatcher(config, runners, on_complete=fires.append, clock=clock, inline=True)
+    # 仮想時計では次の期限まで一度に進める（待機の上限で刻むと、長い期間で待機の回数が増える）
+    timer = TimerQueue(max_wait_seconds=None, clock=clock)
+    timer.add(end, EVENT_STOP)
+    scheduler_loop(schedule_set, timer, dispatcher)
+    return fires
+
+
+def _parse_simulation_time(value: str, end_of_day: bool) -> datetime:
+    """
+    'YYYY-MM-DD' または 'YYYY-MM-DDTHH:MM:SS' 形式の日時を解析する。
+
+    Raises:
+        ValueError: 日時の形式が不正な場合
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"日時の形式が不正です: {value}")
+    if len(value) == 10 and end_of_day:
+        return datetime.combine(parsed.date(), dt_time.max)
+    return parsed
+
+
+def simulate(base_path: str, start: datetime, end: datetime):
+    """--simulate で起動された場合の処理。実行予定を仮想時間で再現して一覧表示する。"""
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s - %(message)s", stream=sys.stdout)
+
+    config = load_config(os.path.join(base_path, "config.json"))
+    if not config:
+        sys.exit(1)
+
+    started = time.perf_counter()
+    fires = run_simulation(config, base_path, start, end)
+    elapsed = time.perf_counter() - started
+
+    print(f"--- シミュレーション結果 ({start} ～ {end}) ---")
+    for record in fires:
+        task = record.occurrence
+        print(f"{_format_task(task)} [{record.outcome}, 遅延 {record.lateness:.3f}秒]")
+    days = len({record.occurrence.datetime.date() for record in fires})
+    print("-----------------------------------------")
+    print(f"実行回数: {len(fires)}件 / 実行日数: {days}日 / 処理時間: {elapsed:.3f}秒")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="音楽再生スケジューラ")
+    parser.add_argument(
+        "--simulate",
+        nargs=2,
+        metavar=("START", "END"),
+        help="STARTからENDまでのスケジュールを仮想時間で実行し、実行予定を表示して終了する（YYYY-MM-DD[THH:MM:SS]）",
+    )
+    args = parser.parse_args(argv)
+    if args.simulate:
+        # 開始日時・終了日時で日付のみの場合の扱いが異なるため、typeではなく解析後に変換する
+        start_text, end_text = args.simulate
+        try:
+            args.simulate = (
+                _parse_simulation_time(start_text, end_of_day=False),
+                _parse_simulation_time(end_text, end_of_day=True),
             )
+        except ValueError as e:
+            parser.error(str(e))
+    return args
+
+
+def _log_schedule_set(schedule_set: ScheduleSet, today: date):
+    """起動時に、読み込んだ各スケジュールの期間と毎日のタスクを表示する。"""
+    for schedule in schedule_set.schedules:
+        if schedule.name:
+            logging.info(f"  スケジュール: {schedule.name}")
+        logging.info(f"  開始年月日: {schedule.start_date}")
+        logging.info(f"  終了年月日: {schedule.end_date}")
+        logging.info(f"  休日リスト: {schedule.holiday_path}")
+        logging.info("  毎日のスケジュール:")
+        for task in schedule.tasks:
+            logging.info(f"    - 時刻: {task.time}, タスクタイプ: {task.task_type}, タスクパス: {task.task_path}")
+        # スケジュールは常に現在時刻から展開するため、過去の開始年月日は本日からとして扱われる
+        if schedule.start_date < today:
+            logging.warning(f"設定の開始年月日 ({schedule.start_date}) が過去の日付です。")
+            logging.warning(f"これを無視して、本日 ({today}) からのスケジュールを実行します。")
 
-            if executed_task["task_type"] == "play_mp3":
-                success, message = play_mp3_safely(resolved_task_path)
-            elif executed_task["task_type"] == "run_exe":
-                success, message = run_exe(resolved_task_path)
-
-            logging.info(f"タスク実行結果: {message}")
-            if not success:
-                logging.error("タスク実行でエラーが発生しました。")
-
-            # --- 実行後処理 ---
-            with status_lock:
-                APP_STATUS["pending_task_count"] = len(tasks_for_today)
-                APP_STATUS["next_task_time"] = (
-                    tasks_for_today[0]["datetime"].strftime("%Y-%m-%d %H:%M:%S (%a)") if tasks_for_today else "なし"
-                )
-                APP_STATUS["status"] = "監視中"
-
-            if tasks_for_today:
-                next_upcoming_task = tasks_for_today[0]
-                logging.info(
-                    f"次回のスケジュール: {next_upcoming_task['datetime'].strftime('%Y-%m-%d %H:%M:%S (%a)')} - {next_upcoming_task['task_type']}: {next_upcoming_task['task_path']}"
-                )
-            else:
-                logging.info("本日の残りのスケジュールはありません。")
 
-        except Exception as e:
-            logging.critical(f"ループで致命的エラー: {e}", exc_info=True)
-            with status_lock:
-                APP_STATUS["status"] = "エラー発生"
-            time.sleep(5)
+def _report_startup():
+    """スケジューラが最初の待機に入る直前に、起動時間の内訳をログに出力する。"""
+    STARTUP_TIMER.mark("first_wait")
+    STARTUP_TIMER.report()
 
 
 # --- メイン実行ブロック ---
 def main():
+    args = parse_args()
+    base_path = os.path.dirname(sys.executable) if getattr(sys, "frozen", False) else os.path.dirname(__file__)
+
+    if args.simulate:
+        # シミュレーションはタスクを実行しないため、二重起動防止の対象外とする
+        simulate(base_path, *args.simulate)
+        return
+
+    # --- ★★★ アプリケーションの二重起動を防止するためのライブラリ ★★★ ---
+    # シミュレーションでは使用しないため、ここで読み込む
+    try:
+        from tendo import singleton
+    except ImportError:
+        print("エラー: tendoライブラリが必要です。コマンドプロンプトで 'pip install tendo' を実行してください。")
+        sys.exit(1)
+
     # ★★★ この一行で、アプリケーションのインスタンスが一つであることを保証する ★★★
     # もし既に起動している場合、ここでプログラムは例外を発生させて終了する。
     singleton.SingleInstance()
+    STARTUP_TIMER.mark("imports")
 
-    base_path = os.path.dirname(sys.executable) if getattr(sys, "frozen", False) else os.path.dirname(__file__)
-    setup_logging(base_path)
+    # ログのローテーション設定を反映するため、ログ出力の開始前に設定ファイルを読み込む
+    config_path = os.path.join(base_path, "config.json")
+    config = load_config(config_path)
+    setup_logging(base_path, config.get("logging", {}) if config else None)
     logging.info("========================================")
     logging.info("音楽再生スケジューラを開始します。")
     logging.info("========================================")
 
-    config = load_config(os.path.join(base_path, "config.json"))
     if not config:
         logging.error("設定読込失敗。終了します。")
         sys.exit(1)
-    else:
-        logging.info("設定読込成功。")
-        logging.info(f"  開始年月日: {config['schedule_period']['start_date']}")
-        logging.info(f"  終了年月日: {config['schedule_period']['end_date']}")
-        logging.info("  毎日のスケジュール:")
-        for schedule in config["daily_schedules"]:
-            logging.info(
-                f"    - 時刻: {schedule['time']}, タスクタイプ: {schedule['task_type']}, タスクパス: {schedule['task_path']}"
-            )
+    STARTUP_TIMER.mark("config")
+
+    # 設定はここで一度だけ解析し、以降のスケジュール展開はすべて解析済みのデータを使う
+    schedule_set = load_schedule_set(config, config_path)
+    if schedule_set is None:
+        logging.error("スケジュールの指定が不正です。終了します。")
+        sys.exit(1)
+    logging.info("設定読込成功。")
+    _log_schedule_set(schedule_set, date.today())
+    STARTUP_TIMER.mark("schedule_build")
 
-    # configのstart_dateが過去の場合の処理
-    config_start_date = datetime.strptime(config["schedule_period"]["start_date"], "%Y-%m-%d").date()
-    today = date.today()
+    # 休日リストはスケジューラの最初の展開で必要になるため、ここで読み込んでおく（以降はキャッシュを使う）
+    for holiday_path in schedule_set.holiday_paths:
+        load_holiday_index(holiday_path)
+    STARTUP_TIMER.mark("holidays")
 
-    if config_start_date < today:
-        logging.warning(f"設定の開始年月日 ({config_start_date}) が過去の日付です。")
-        logging.warning(f"これを無視して、本日 ({today}) からのスケジュールを実行します。")
-        config["schedule_period"]["start_date"] = today.strftime("%Y-%m-%d")
+    configure_audio_engine(config, base_path, schedule_set)
+    configure_process_supervisor(config)
 
-    future_schedule = calculate_schedule(config, base_path)
-    with status_lock:
-        APP_STATUS["config"] = config
-        APP_STATUS["full_schedule_for_ui"] = copy.deepcopy(future_schedule)
+    # 今後のスケジュールはスケジューラスレッドがウィンドウから取得して公開する
+    APP_STATUS.publish(config=config)
+
+    dispatcher = build_task_dispatcher(
+        config, build_task_runners(SYSTEM_CLOCK), on_complete=_log_fire_record, clock=SYSTEM_CLOCK, stagers=TASK_STAGERS
+    )
+    timer = TimerQueue()
+    watcher = start_file_watcher(config_path, base_path, schedule_set, timer, config)
+    metrics_server = start_metrics_server(config)
+    STARTUP_TIMER.mark("services")
 
     scheduler_thread = threading.Thread(
         target=scheduler_loop,
         args=(
-            config,
-            base_path,
+            schedule_set,
+            timer,
+            dispatcher,
+            _report_startup,
         ),
         daemon=True,
     )
@@ -285,6 +804,19 @@ def main():
             scheduler_thread.join(timeout=1.0)
     except KeyboardInterrupt:
         logging.info("アプリケーションを終了します。")
+        # 待機中のスケジューラを起こして停止させる（再生中のタスクがあれば完了を待たない）
+        timer.shutdown()
+        scheduler_thread.join(timeout=5.0)
+        get_audio_engine().shutdown(timeout=5.0)
+        dispatcher.shutdown(wait=False, cancel_pending=True)
+    else:
+        # すべてのスケジュールが終了した場合も、実行中のタスク（再生中の曲など）の完了を待ってから終了する
+        dispatcher.shutdown(wait=True)
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,295 @@
+# metrics.py
+
+import bisect
+import json
+import logging
+import math
+import threading
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+# 秒単位の計測値に使う既定のバケット（タスクの起動遅延から曲の再生時間までを想定）
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0, 300.0)
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+DEFAULT_METRICS_PORT = 9754
+
+
+def _label_text(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """増加のみする計測値。ラベルの値の組ごとに集計する。"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0.0)
+
+    def samples(self) -> list:
+        """[(ラベルの値の組, 値), ...] を返す。"""
+        with self._lock:
+            return sorted(self._values.items())
+
+    def prometheus_lines(self) -> list:
+        return [f"{self.name}{_label_text(self.label_names, labels)} {_format_value(v)}" for labels, v in self.samples()]
+
+    def to_dict(self) -> list:
+        return [{"labels": dict(zip(self.label_names, labels)), "value": v} for labels, v in self.samples()]
+
+
+class Histogram:
+    """
+    計測値の分布。ラベルの値の組ごとに、固定のバケットへの件数・合計・件数を集計する。
+
+    1回の記録はbisectでバケットを探して加算するだけで、個々の値は保持しない。
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # ラベルの値の組 -> [バケットごとの件数..., +Infの件数, 合計, 件数]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(label_values)
+            if data is None:
+                data = self._values[label_values] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            data[index] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def samples(self) -> list:
+        """[(ラベルの値の組, 累積のバケット件数, 合計, 件数), ...] を返す。"""
+        with self._lock:
+            items = [(labels, list(data)) for labels, data in sorted(self._values.items())]
+        result = []
+        for labels, data in items:
+            cumulative, total = [], 0
+            for count in data[: len(self.buckets) + 1]:
+                total += count
+                cumulative.append(total)
+            result.append((labels, cumulative, data[-2], data[-1]))
+        return result
+
+    def prometheus_lines(self) -> list:
+        lines = []
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for labels, cumulative, total, count in self.samples():
+            for bound, value in zip(bounds, cumulative):
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.label_names, labels, le)} {value}")
+            lines.append(f"{self.name}_sum{_label_text(self.label_names, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.label_names, labels)} {count}")
+        return lines
+
+    def to_dict(self) -> list:
+        return [
+            {
+                "labels": dict(zip(self.label_names, labels)),
+                "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], cumulative)),
+                "sum": total,
+                "count": count,
+            }
+            for labels, cumulative, total, count in self.samples()
+        ]
+
+
+class MetricsRegistry:
+    """計測値の一覧。同じ名前で登録した場合は既存の計測値を返す。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, object] = {}
+        self._gauge_sources: list = []
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def histogram(
+        self, name: str, help_text: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def add_gauge_source(self, source: Callable[[], Dict[str, Tuple[str, float]]]):
+        """
+        出力時に現在値を取得するゲージの取得関数を登録する。
+
+        Args:
+            source: {名前: (説明, 値)} を返す関数
+        """
+        with self._lock:
+            self._gauge_sources.append(source)
+
+    def _gauges(self) -> Dict[str, Tuple[str, float]]:
+        with self._lock:
+            sources = list(self._gauge_sources)
+        gauges = {}
+        for source in sources:
+            gauges.update(source())
+        return gauges
+
+    def render_prometheus(self) -> str:
+        """Prometheusのテキスト形式で出力する。"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.prometheus_lines())
+        for name, (help_text, value) in self._gauges().items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        """JSON形式で出力するための辞書を返す。"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        result = {
+            metric.name: {"type": metric.kind, "help": metric.help_text, "values": metric.to_dict()} for metric in metrics
+        }
+        for name, (help_text, value) in self._gauges().items():
+            result[name] = {"type": "gauge", "help": help_text, "values": [{"labels": {}, "value": value}]}
+        return result
+
+
+# アプリケーション全体で共有する計測値
+METRICS = MetricsRegistry()
+TASK_FIRES = METRICS.counter("scheduler_task_fires_total", "タスクの実行時刻の到来回数", ("task_type", "outcome"))
+TASK_FAILURES = METRICS.counter("scheduler_task_failures_total", "失敗したタスクの数", ("task_type",))
+FIRE_LATENESS = METRICS.histogram(
+    "scheduler_fire_lateness_seconds", "実行時刻からタスクの開始までの遅延（秒）", ("task_type",)
+)
+TASK_DURATION = METRICS.histogram("scheduler_task_duration_seconds", "タスクの所要時間（秒）", ("task_type",))
+SCHEDULE_COMPUTE = METRICS.histogram(
+    "scheduler_schedule_compute_seconds", "スケジュールの計算にかかった時間（秒）", ("operation",)
+)
+HOLIDAY_LOADS = METRICS.counter("scheduler_holiday_loads_total", "休日リストの読み込み回数", ("result",))
+CONFIG_RELOADS = METRICS.counter("scheduler_config_reloads_total", "設定ファイルの再読込回数", ("result",))
+START_SKEW = METRICS.histogram(
+    "scheduler_start_skew_seconds",
+    "実行時刻から実際に再生・起動した時刻までの誤差（秒、負の値は早すぎ）",
+    ("task_type",),
+    (-0.1, -0.01, -0.001, 0.0, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+PROCESS_TIMEOUTS = METRICS.counter("scheduler_process_timeouts_total", "制限時間を超えて強制終了したプログラムの数")
+
+
+def _build_request_handler(registry: MetricsRegistry, status_source: Optional[Callable[[], dict]]):
+    """
+    registry・status_sourceを返すリクエストハンドラのクラスを作成する。
+
+    http.serverは計測値の出力を有効にした場合にだけ必要なため、ここで読み込む。
+    """
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/metrics":
+                self._send(200, "text/plain; version=0.0.4; charset=utf-8", registry.render_prometheus())
+            elif path == "/metrics.json":
+                self._send_json(registry.to_dict())
+            elif path == "/status" and status_source is not None:
+                self._send_json(status_source())
+            else:
+                self._send(404, "text/plain; charset=utf-8", "not found\n")
+
+        def _send_json(self, data):
+            self._send(200, "application/json; charset=utf-8", json.dumps(data, ensure_ascii=False, default=str))
+
+        def _send(self, code: int, content_type: str, body: str):
+            payload = body.encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            # アクセスごとのログはapp.logに出力しない
+            pass
+
+    return MetricsRequestHandler
+
+
+class MetricsServer:
+    """
+    計測値を返すHTTPサーバー。既定では同じPCからのアクセスのみ受け付ける（127.0.0.1で待ち受け）。
+
+    - /metrics: Prometheusのテキスト形式
+    - /metrics.json: JSON形式
+    - /status: アプリケーションの状態（status_sourceを指定した場合）
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry = METRICS,
+        status_source: Optional[Callable[[], dict]] = None,
+        host: str = DEFAULT_METRICS_HOST,
+        port: int = DEFAULT_METRICS_PORT,
+    ):
+        from http.server import ThreadingHTTPServer
+
+        self._server = ThreadingHTTPServer((host, port), _build_request_handler(registry, status_source))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        logging.info("計測値の出力を開始しました: http://%s:%d/metrics", *self.address)
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
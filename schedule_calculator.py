@@ -1,6 +1,35 @@
 import csv
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import date, datetime, time as dt_time, timedelta
+import io
+from itertools import islice
 import os
+import threading
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from metrics import HOLIDAY_LOADS
+
+
+# 休日リストのキャッシュ（プロセス全体で共有）: パス -> (mtime_ns, size, 休日の序数セット)
+# ファイルがない場合は (None, None, NO_HOLIDAYS) を保持する
+_holiday_cache: dict = {}
+_holiday_cache_lock = threading.Lock()
+
+# 休日リストがない場合の休日の序数セット（呼び出しのたびに同じオブジェクトを返す）
+NO_HOLIDAYS: frozenset = frozenset()
+
+
+def _decode_holiday_file(holiday_file_path: str) -> str:
+    """
+    休日リストCSVファイルを1回だけ読み込み、UTF-8、失敗した場合はShift_JISでデコードする。
+    """
+    with open(holiday_file_path, "rb") as f:
+        data = f.read()
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        # logging.info("休日リストのUTF-8での読み込みに失敗、Shift_JISで再試行します。")
+        return data.decode("shift_jis")
 
 
 def read_holidays(holiday_file_path: str) -> set:
@@ -14,66 +43,349 @@ def read_holidays(holiday_file_path: str) -> set:
         return holidays
 
     try:
-        with open(holiday_file_path, "r", encoding="utf-8", newline="") as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if row:
-                    holidays.add(row[0].strip())
-        # logging.info("休日リストをUTF-8で読み込みました。")
+        text = _decode_holiday_file(holiday_file_path)
+        for row in csv.reader(io.StringIO(text, newline="")):
+            if row:
+                holidays.add(row[0].strip())
         return holidays
-    except UnicodeDecodeError:
-        # logging.info("休日リストのUTF-8での読み込みに失敗、Shift_JISで再試行します。")
-        try:
-            with open(holiday_file_path, "r", encoding="shift_jis", newline="") as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if row:
-                        holidays.add(row[0].strip())
-            # logging.info("休日リストをShift_JISで読み込みました。")
-            return holidays
-        except Exception:
-            # logging.error(f"Shift_JISでの休日リスト読み込みに失敗しました。: {e}")
-            return set()
     except Exception:
         # logging.error(f"休日リストの読み込み中に予期せぬエラーが発生しました。: {e}")
         return set()
 
 
-def calculate_schedule(config: dict, base_path: str) -> list:
+def load_holiday_index(holiday_file_path: str) -> frozenset:
     """
-    設定情報に基づき、実行すべき全タスクのリスト（日時とタスク内容）を生成する。
+    休日リストを日付の序数（date.toordinal()）のセットとして返す。
+
+    結果はパスごとにキャッシュし、ファイルの更新日時・サイズが変わった場合のみ再読込する。
+    休日判定は `target_date.toordinal() in index` で行え、日付の文字列化は不要となる。
+
+    Args:
+        holiday_file_path (str): 休日リストCSVファイルのパス
+
+    Returns:
+        frozenset: 休日の序数のセット（ファイルがない場合はNO_HOLIDAYS）
+    """
+    try:
+        stat = os.stat(holiday_file_path)
+    except OSError:
+        with _holiday_cache_lock:
+            cached = _holiday_cache.get(holiday_file_path)
+            # ファイルがない状態も記録し、なくなった時点で1回だけ計測する
+            if cached is None or cached[0] is not None:
+                _holiday_cache[holiday_file_path] = (None, None, NO_HOLIDAYS)
+                HOLIDAY_LOADS.inc("missing")
+        return NO_HOLIDAYS
+
+    with _holiday_cache_lock:
+        cached = _holiday_cache.get(holiday_file_path)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        ordinals = set()
+        for holiday in read_holidays(holiday_file_path):
+            # 'YYYY-MM-DD' 形式の行のみを休日として扱う（見出し行などは無視する）
+            if len(holiday) != 10:
+                continue
+            try:
+                ordinals.add(date.fromisoformat(holiday).toordinal())
+            except ValueError:
+                continue
+        index = frozenset(ordinals)
+        _holiday_cache[holiday_file_path] = (stat.st_mtime_ns, stat.st_size, index)
+        HOLIDAY_LOADS.inc("loaded")
+        return index
+
+
+# daily_schedulesで指定できるタスクタイプ
+TASK_TYPES = ("play_mp3", "run_exe")
+
+
+class CompiledTask(NamedTuple):
+    """daily_schedulesの1エントリを解析済みの形で保持する。"""
+
+    index: int  # daily_schedules内の位置
+    time: dt_time  # 実行時刻
+    task_type: str  # TASK_TYPESのいずれか
+    task_path: str  # 設定ファイルに記述されたパス
+    resolved_path: str  # base_pathで解決した絶対パス
+    schedule_name: str = ""  # タスクが属するスケジュールの名前（複数のスケジュールを動かす場合）
+
+
+class Occurrence(NamedTuple):
+    """スケジュール上の1回の実行。タスクの内容はCompiledTaskを参照する。"""
+
+    datetime: datetime
+    task: CompiledTask
+
+    @property
+    def task_type(self) -> str:
+        return self.task.task_type
+
+    @property
+    def task_path(self) -> str:
+        return self.task.task_path
+
+    @property
+    def resolved_path(self) -> str:
+        return self.task.resolved_path
+
+    @property
+    def schedule_name(self) -> str:
+        return self.task.schedule_name
+
+
+class CompiledSchedule(NamedTuple):
+    """設定ファイルを一度だけ解析した結果。スケジュールの展開はこれを入力とする。"""
+
+    start_date: date
+    end_date: date
+    holiday_path: str
+    tasks: Tuple[CompiledTask, ...]  # 実行時刻順（同一時刻は設定順）
+    name: str = ""  # スケジュールの名前
+
+    @property
+    def holidays(self) -> frozenset:
+        """休日の序数セット。休日リストが更新されていれば再読込される。"""
+        return load_holiday_index(self.holiday_path)
+
+
+def compile_schedule(config: dict, base_path: str, name: str = "") -> Optional[CompiledSchedule]:
     """
-    schedule_list = []
+    設定情報を解析し、スケジュール展開用のCompiledScheduleを生成する。
+
+    daily_schedulesの時刻・タスクタイプ・パスはここで一度だけ検証・解析する。
+    不正なエントリは警告を1回だけ表示して除外する。
 
+    Args:
+        config (dict): 設定データ
+        base_path (str): 相対パスを解決する基準ディレクトリ
+        name (str): スケジュールの名前（各タスクにも記録する）
+
+    Returns:
+        CompiledSchedule: 解析結果
+        None: 期間指定・daily_schedulesの形式が不正な場合
+    """
     try:
         start_date = datetime.strptime(config["schedule_period"]["start_date"], "%Y-%m-%d").date()
         end_date = datetime.strptime(config["schedule_period"]["end_date"], "%Y-%m-%d").date()
-        holiday_path = os.path.join(base_path, config["holiday_list_path"])
-    except (KeyError, ValueError) as e:
+        # 同じ休日リストを参照するスケジュールでキャッシュを共有できるよう、絶対パスにそろえる
+        holiday_path = os.path.abspath(os.path.join(base_path, config["holiday_list_path"]))
+    except (KeyError, ValueError, TypeError) as e:
         print(f"エラー: 設定ファイルの期間指定('start_date', 'end_date')が不正です。: {e}")
-        return []
+        return None
 
-    holidays = read_holidays(holiday_path)
+    daily_schedules = config.get("daily_schedules", [])
+    if not isinstance(daily_schedules, list):
+        print(f"エラー: 設定ファイルの 'daily_schedules' はリストで指定してください。: {daily_schedules!r}")
+        return None
 
-    current_date = start_date
-    while current_date <= end_date:
-        is_weekday = current_date.weekday() < 5
-        is_not_holiday = current_date.strftime("%Y-%m-%d") not in holidays
+    tasks = []
+    for index, daily_task in enumerate(daily_schedules):
+        try:
+            # 文字列以外の時刻（800など）や辞書以外のエントリはTypeErrorとなる
+            task_time = datetime.strptime(daily_task["time"], "%H:%M:%S").time()
+            task_type = daily_task["task_type"]
+            task_path = daily_task["task_path"]
+            if task_type not in TASK_TYPES:
+                raise ValueError(f"未対応のタスクタイプです: {task_type}")
+            # タスクパスが絶対パスでない場合、base_pathと結合してフルパスを生成
+            resolved_path = task_path if os.path.isabs(task_path) else os.path.join(base_path, task_path)
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"警告: daily_schedules内のタスク定義が不正なためスキップします。: {daily_task} - {e}")
+            continue
+        tasks.append(CompiledTask(index, task_time, task_type, task_path, os.path.abspath(resolved_path), name))
+    # sortは安定なので、同一時刻のタスクは設定順のまま並ぶ
+    tasks.sort(key=lambda t: t.time)
+
+    return CompiledSchedule(start_date, end_date, holiday_path, tuple(tasks), name)
 
-        if is_weekday and is_not_holiday:
-            for daily_task in config.get("daily_schedules", []):
-                try:
-                    task_time = datetime.strptime(daily_task["time"], "%H:%M:%S").time()
-                    task_datetime = datetime.combine(current_date, task_time)
 
-                    schedule_list.append(
-                        {"datetime": task_datetime, "task_type": daily_task["task_type"], "task_path": daily_task["task_path"]}
-                    )
-                except (KeyError, ValueError) as e:
-                    print(f"警告: daily_schedules内のタスク定義が不正なためスキップします。: {daily_task} - {e}")
+def _is_run_day(target_date: date, holidays: frozenset) -> bool:
+    """平日かつ休日リストに含まれない日であればTrueを返す。"""
+    return target_date.weekday() < 5 and target_date.toordinal() not in holidays
 
+
+def iter_schedule(
+    schedule: CompiledSchedule, start: Optional[datetime] = None, end: Optional[datetime] = None
+) -> Iterator[Occurrence]:
+    """
+    スケジュールを時刻順に1件ずつ展開するジェネレータ。
+
+    リストを構築・ソートせず、必要になった分だけ日を進めて展開するため、
+    期間の長さに関係なくメモリ使用量は一定となる。
+
+    Args:
+        schedule (CompiledSchedule): compile_schedule()の結果
+        start (datetime, optional): この日時以降（同時刻を含む）のタスクのみ生成する
+        end (datetime, optional): この日時以前（同時刻を含む）のタスクのみ生成する
+
+    Yields:
+        Occurrence: 実行日時とタスク
+    """
+    tasks = schedule.tasks
+    if not tasks:
+        return
+    holidays = schedule.holidays
+
+    # 期間の先頭から数えずに、開始日時の日付へ直接移動する
+    current_date = schedule.start_date if start is None else max(schedule.start_date, start.date())
+    end_date = schedule.end_date if end is None else min(schedule.end_date, end.date())
+
+    while current_date <= end_date:
+        if _is_run_day(current_date, holidays):
+            for task in tasks:
+                task_datetime = datetime.combine(current_date, task.time)
+                if start is not None and task_datetime < start:
+                    continue
+                if end is not None and task_datetime > end:
+                    return
+                yield Occurrence(task_datetime, task)
         current_date += timedelta(days=1)
 
-    schedule_list.sort(key=lambda x: x["datetime"])
 
-    return schedule_list
+def next_occurrence(schedule: CompiledSchedule, after: datetime) -> Optional[Occurrence]:
+    """
+    指定日時より後（同時刻は含まない）に実行される最初のタスクを返す。
+
+    Args:
+        schedule (CompiledSchedule): compile_schedule()の結果
+        after (datetime): 基準日時
+
+    Returns:
+        Occurrence: 次回のタスク
+        None: 期間内に該当するタスクがない場合
+    """
+    for occurrence in iter_schedule(schedule, start=after):
+        if occurrence.datetime > after:
+            return occurrence
+    return None
+
+
+def occurrences_between(schedule: CompiledSchedule, start: datetime, end: datetime) -> Iterator[Occurrence]:
+    """
+    start以上end以下の日時に実行されるタスクを時刻順に生成する。
+
+    Args:
+        schedule (CompiledSchedule): compile_schedule()の結果
+        start (datetime): 範囲の開始日時
+        end (datetime): 範囲の終了日時
+
+    Yields:
+        Occurrence: 実行日時とタスク
+    """
+    return iter_schedule(schedule, start=start, end=end)
+
+
+class ScheduleWindow:
+    """
+    スケジューラが保持する、現在時刻以降のタスクのローリングウィンドウ。
+
+    起動時に一度だけiter_schedule()を開始し、必要になった分だけ先読みして保持する。
+    時間の経過に合わせて過去のタスクを先頭から捨て、末尾は1日分ずつ延長するため、
+    日付が変わるたびに期間全体を再計算する必要がない。
+    今後のスケジュール表示・本日のタスク・次回の起床時刻はすべてこのウィンドウから取得する。
+    """
+
+    def __init__(self, schedule: CompiledSchedule, now: datetime):
+        self._schedule = schedule
+        self._buffer: deque = deque()
+        self._start(now)
+
+    def _start(self, now: datetime, inclusive: bool = False):
+        """現在時刻より後（inclusiveがTrueの場合は同時刻を含む）のタスクから展開をやり直す。"""
+        self._holidays = self._schedule.holidays
+        self._source = (o for o in iter_schedule(self._schedule, start=now) if inclusive or o.datetime > now)
+        self._buffer.clear()
+        self._exhausted = False
+
+    def _extend_one_day(self) -> bool:
+        """ソースから次の実行日1日分のタスクを読み込む。これ以上ない場合はFalseを返す。"""
+        if self._exhausted:
+            return False
+        first = next(self._source, None)
+        if first is None:
+            self._exhausted = True
+            return False
+        self._buffer.append(first)
+        for occurrence in self._source:
+            self._buffer.append(occurrence)
+            if occurrence.datetime.date() != first.datetime.date():
+                # 翌実行日の先頭を1件読み込んだところで止める
+                return True
+        self._exhausted = True
+        return True
+
+    def advance(self, now: datetime, inclusive: bool = False):
+        """
+        現在時刻以前（inclusiveがTrueの場合は現在時刻より前）のタスクをウィンドウから取り除く。
+
+        休日リストの内容が変わっていた場合や、先読み済みのタスクをすべて過ぎた場合は、
+        現在時刻から展開をやり直す（途中の日を1日ずつ読み進めない）。
+        """
+        # 休日リストは内容で比較する（再読込で同じ内容の別オブジェクトになっても展開し直さない）
+        if self._schedule.holidays != self._holidays:
+            self._start(now, inclusive)
+            return
+        while self._buffer and (self._buffer[0].datetime < now if inclusive else self._buffer[0].datetime <= now):
+            self._buffer.popleft()
+        if not self._buffer and not self._exhausted:
+            self._start(now, inclusive)
+
+    def upcoming(self, now: datetime, count: int) -> list:
+        """現在時刻より後のタスクを先頭からcount件返す。"""
+        self.advance(now)
+        while len(self._buffer) < count and self._extend_one_day():
+            pass
+        return list(islice(self._buffer, count))
+
+    def next_after(self, now: datetime) -> Optional[Occurrence]:
+        """現在時刻より後の最初のタスクを返す。ない場合はNone。"""
+        upcoming = self.upcoming(now, 1)
+        return upcoming[0] if upcoming else None
+
+    def for_day(self, target_date: date, now: datetime, inclusive: bool = False) -> list:
+        """指定日のタスクのうち、現在時刻より後（inclusiveがTrueの場合は同時刻を含む）のものを時刻順に返す。"""
+        self.advance(now, inclusive)
+        day_end = datetime.combine(target_date, dt_time.max)
+        while (not self._buffer or self._buffer[-1].datetime <= day_end) and self._extend_one_day():
+            pass
+        return [o for o in self._buffer if o.datetime.date() == target_date]
+
+
+def occurrence_times(
+    schedule: CompiledSchedule, start: Optional[datetime] = None, end: Optional[datetime] = None
+) -> List[datetime]:
+    """
+    start以上end以下の実行日時を時刻順に一括生成する（長期間のエクスポートなどの一括処理用）。
+
+    NumPyが利用可能な場合はschedule_numpyのベクトル化した実装で生成し、利用できない場合はiter_schedule()で展開する。
+    どちらの場合もdatetimeのリストを返す。
+
+    Args:
+        schedule (CompiledSchedule): compile_schedule()の結果
+        start (datetime, optional): 範囲の開始日時
+        end (datetime, optional): 範囲の終了日時
+
+    Returns:
+        List[datetime]: 実行日時のリスト（iter_schedule()と同じ順序）
+    """
+    # NumPyの読み込みは時間がかかるため、一括処理で必要になった時点で行う
+    import schedule_numpy
+
+    if schedule_numpy.is_available():
+        # datetime64[s]の配列のtolist()はdatetimeのリストとなる
+        return schedule_numpy.occurrence_array(schedule, start, end).tolist()
+    return [occurrence.datetime for occurrence in iter_schedule(schedule, start=start, end=end)]
+
+
+def calculate_schedule(config: dict, base_path: str) -> list:
+    """
+    設定情報に基づき、実行すべき全タスクのリスト（日時とタスク内容）を生成する。
+
+    iter_scheduleは時刻順に生成するため、ここで改めてソートする必要はない。
+    """
+    schedule = compile_schedule(config, base_path)
+    if schedule is None:
+        return []
+    return list(iter_schedule(schedule))
@@ -0,0 +1,93 @@
+# schedule_numpy.py
+
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from schedule_calculator import CompiledSchedule
+
+# date.toordinal() と numpy.datetime64[D]（1970-01-01 からの日数）の差
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# 月曜～金曜を営業日とする（schedule_calculatorの平日判定と同じ）
+_WEEKMASK = "1111100"
+
+
+def is_available() -> bool:
+    """NumPyが利用可能であればTrueを返す。"""
+    return np is not None
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("NumPyがインストールされていないため、NumPyバックエンドは利用できません。")
+
+
+def business_day_calendar(schedule: CompiledSchedule):
+    """
+    休日リストを反映したnumpy.busdaycalendarを返す。
+
+    休日の序数セット（load_holiday_index()の結果）をdatetime64[D]の配列に変換して渡す。
+    """
+    _require_numpy()
+    ordinals = np.fromiter(schedule.holidays, dtype=np.int64) - _EPOCH_ORDINAL
+    return np.busdaycalendar(weekmask=_WEEKMASK, holidays=ordinals.astype("datetime64[D]"))
+
+
+def occurrence_matrix(
+    schedule: CompiledSchedule, start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    実行日とその日の各タスクの実行日時を、日 x タスクの2次元配列として一括生成する。
+
+    実行日はbusday_count/busday_offsetで求めるため、日ごとのループは発生しない。
+
+    Args:
+        schedule (CompiledSchedule): compile_schedule()の結果
+        start_date (date, optional): 開始日（省略時は設定の開始日）。設定の期間外は切り詰める。
+        end_date (date, optional): 終了日（省略時は設定の終了日）。設定の期間外は切り詰める。
+
+    Returns:
+        tuple: (実行日の配列 datetime64[D] (日数,), 実行日時の配列 datetime64[s] (日数, タスク数))
+            列はschedule.tasksの順で、各行は時刻順に並んでいるため、row-majorで平坦化すると全体が時刻順になる。
+    """
+    _require_numpy()
+    first = np.datetime64(max(schedule.start_date, start_date or schedule.start_date), "D")
+    last = np.datetime64(min(schedule.end_date, end_date or schedule.end_date), "D")
+    offsets = np.array(
+        [t.time.hour * 3600 + t.time.minute * 60 + t.time.second for t in schedule.tasks], dtype="timedelta64[s]"
+    )
+
+    calendar = business_day_calendar(schedule)
+    count = max(int(np.busday_count(first, last + 1, busdaycal=calendar)), 0) if first <= last else 0
+    if count == 0:
+        return np.empty(0, dtype="datetime64[D]"), np.empty((0, len(offsets)), dtype="datetime64[s]")
+
+    days = np.busday_offset(first, np.arange(count), roll="forward", busdaycal=calendar)
+    times = days.astype("datetime64[s]")[:, np.newaxis] + offsets[np.newaxis, :]
+    return days, times
+
+
+def occurrence_array(schedule: CompiledSchedule, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """
+    start以上end以下の実行日時を時刻順のdatetime64[s]の1次元配列として返す。
+
+    Args:
+        schedule (CompiledSchedule): compile_schedule()の結果
+        start (datetime, optional): 範囲の開始日時
+        end (datetime, optional): 範囲の終了日時
+
+    Returns:
+        numpy.ndarray: 実行日時の配列（datetime64[s]）
+    """
+    _, times = occurrence_matrix(schedule, start.date() if start else None, end.date() if end else None)
+    flat = times.ravel()
+    if start is not None:
+        flat = flat[flat >= np.datetime64(start)]
+    if end is not None:
+        flat = flat[flat <= np.datetime64(end)]
+    return flat
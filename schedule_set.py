@@ -0,0 +1,117 @@
+# schedule_set.py
+
+import heapq
+import os
+from datetime import date, datetime
+from itertools import islice
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+from config_loader import load_config
+from schedule_calculator import CompiledSchedule, Occurrence, ScheduleWindow, compile_schedule
+
+
+def _occurrence_time(occurrence: Occurrence) -> datetime:
+    return occurrence.datetime
+
+
+class ScheduleSet(NamedTuple):
+    """1つのプロセスで動かす名前付きスケジュールの一覧と、それらを定義した設定ファイルのパス。"""
+
+    schedules: Tuple[CompiledSchedule, ...]
+    config_paths: Tuple[str, ...]  # メインの設定ファイルと、schedulesから参照した設定ファイル
+
+    @property
+    def holiday_paths(self) -> Tuple[str, ...]:
+        """参照している休日リストのパス（重複を除く）。"""
+        return tuple(dict.fromkeys(schedule.holiday_path for schedule in self.schedules))
+
+    @property
+    def watch_paths(self) -> Tuple[str, ...]:
+        """変更を監視するファイルのパス（設定ファイルと休日リスト）。"""
+        return tuple(dict.fromkeys(self.config_paths + self.holiday_paths))
+
+
+def load_schedule_set(config: dict, config_path: str) -> Optional[ScheduleSet]:
+    """
+    設定データからScheduleSetを作成する。
+
+    "schedules" がない場合は、設定データ自体を名前なしの1つのスケジュールとして扱う。
+    "schedules" の各エントリは、"config_path" で別の設定ファイルを参照するか、
+    schedule_period・holiday_list_path・daily_schedulesを直接記述する。
+    別の設定ファイル内の相対パスは、そのファイルのあるディレクトリを基準に解決する。
+
+    Args:
+        config (dict): メインの設定データ
+        config_path (str): メインの設定ファイルのパス
+
+    Returns:
+        ScheduleSet: 解析結果
+        None: いずれかのスケジュールが読み込めない・期間指定が不正・名前が重複している場合
+    """
+    base_path = os.path.dirname(os.path.abspath(config_path))
+    entries = config.get("schedules")
+    if entries is None:
+        schedule = compile_schedule(config, base_path)
+        return None if schedule is None else ScheduleSet((schedule,), (config_path,))
+    if not isinstance(entries, list) or not entries:
+        print("エラー: 設定ファイルの 'schedules' はスケジュールのリストで指定してください。")
+        return None
+
+    schedules, config_paths, names = [], [config_path], set()
+    for number, entry in enumerate(entries, start=1):
+        if not isinstance(entry, dict):
+            print(f"エラー: schedulesの{number}番目の指定が不正です。: {entry}")
+            return None
+        name = str(entry.get("name", f"schedule{number}"))
+        if name in names:
+            print(f"エラー: スケジュールの名前が重複しています。: {name}")
+            return None
+        names.add(name)
+
+        schedule_config, schedule_base = entry, base_path
+        if "config_path" in entry:
+            path = os.path.join(base_path, entry["config_path"])
+            schedule_config = load_config(path)
+            if not schedule_config:
+                print(f"エラー: スケジュール '{name}' の設定ファイルを読み込めませんでした。")
+                return None
+            schedule_base = os.path.dirname(os.path.abspath(path))
+            config_paths.append(path)
+
+        schedule = compile_schedule(schedule_config, schedule_base, name)
+        if schedule is None:
+            print(f"エラー: スケジュール '{name}' の設定が不正です。")
+            return None
+        schedules.append(schedule)
+    return ScheduleSet(tuple(schedules), tuple(config_paths))
+
+
+class MergedScheduleWindow:
+    """
+    複数のスケジュールのScheduleWindowを束ね、1つのScheduleWindowとして扱えるようにする。
+
+    各ウィンドウが先読みするのは数日分のタスクだけで、問い合わせのたびに結果をk-way mergeする。
+    そのため、メモリ使用量はスケジュールの数と1日あたりのタスク数に比例し、期間の長さには依存しない。
+    """
+
+    def __init__(self, schedules: Sequence[CompiledSchedule], now: datetime):
+        self._windows = [ScheduleWindow(schedule, now) for schedule in schedules]
+
+    def advance(self, now: datetime):
+        for window in self._windows:
+            window.advance(now)
+
+    def upcoming(self, now: datetime, count: int) -> list:
+        """現在時刻より後のタスクを先頭からcount件返す。"""
+        merged = heapq.merge(*(window.upcoming(now, count) for window in self._windows), key=_occurrence_time)
+        return list(islice(merged, count))
+
+    def next_after(self, now: datetime) -> Optional[Occurrence]:
+        """現在時刻より後の最初のタスクを返す。ない場合はNone。"""
+        upcoming = self.upcoming(now, 1)
+        return upcoming[0] if upcoming else None
+
+    def for_day(self, target_date: date, now: datetime, inclusive: bool = False) -> list:
+        """指定日のタスクのうち、現在時刻より後（inclusiveがTrueの場合は同時刻を含む）のものを時刻順に返す。"""
+        days = (window.for_day(target_date, now, inclusive) for window in self._windows)
+        return list(heapq.merge(*days, key=_occurrence_time))
@@ -0,0 +1,81 @@
+# startup_timing.py
+
+import logging
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+# 起動処理の段階の名前と、ログに出力する表示名
+PHASE_LABELS = {
+    "imports": "モジュールの読み込み",
+    "config": "設定ファイルの読み込み",
+    "schedule_build": "スケジュールの作成",
+    "holidays": "休日リストの読み込み",
+    "services": "実行環境の準備",
+    "first_wait": "最初の待機まで",
+}
+
+
+class StartupTimer:
+    """
+    起動処理の段階ごとの所要時間を計測する。
+
+    mark()を呼ぶたびに、前回のmark()（最初は計測の開始時刻）からの経過時間をその段階の時間として記録する。
+    段階の間に隙間ができないため、各段階の合計が起動にかかった時間と一致する。
+    """
+
+    def __init__(self, started: Optional[float] = None):
+        """
+        Args:
+            started (float, optional): 計測の開始時刻（time.perf_counter()の値）。省略した場合は現在時刻
+        """
+        self._lock = threading.Lock()
+        self.started = time.perf_counter() if started is None else started
+        self._last = self.started
+        self._phases: Tuple[Tuple[str, float], ...] = ()
+
+    def mark(self, phase: str) -> float:
+        """
+        前回のmark()からの経過時間を、phaseの所要時間として記録する。
+
+        Returns:
+            float: phaseの所要時間（秒）
+        """
+        now = time.perf_counter()
+        with self._lock:
+            elapsed = now - self._last
+            self._last = now
+            self._phases += ((phase, elapsed),)
+        return elapsed
+
+    @property
+    def phases(self) -> Tuple[Tuple[str, float], ...]:
+        """記録した段階の (名前, 所要時間) を記録順に返す。"""
+        return self._phases
+
+    @property
+    def total(self) -> float:
+        """計測の開始時刻から最後のmark()までの時間（秒）。"""
+        return self._last - self.started
+
+    def to_dict(self) -> dict:
+        return {"total_seconds": self.total, "phases": dict(self._phases)}
+
+    def report(self):
+        """段階ごとの所要時間と、現在のメモリ使用量をログに出力する。"""
+        logging.info("起動時間: 合計 %.3f秒", self.total)
+        for phase, elapsed in self._phases:
+            logging.info("  %s: %.3f秒", PHASE_LABELS.get(phase, phase), elapsed)
+        rss = _resident_memory_bytes()
+        if rss is not None:
+            logging.info("  メモリ使用量: %.1fMB", rss / (1024 * 1024))
+
+
+def _resident_memory_bytes() -> Optional[int]:
+    """このプロセスの物理メモリ使用量（バイト）。psutilがない場合はNone。"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process(os.getpid()).memory_info().rss
@@ -0,0 +1,261 @@
+# task_dispatcher.py
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from clock import SYSTEM_CLOCK
+from metrics import FIRE_LATENESS, TASK_FAILURES, TASK_FIRES
+from schedule_calculator import Occurrence
+
+# 実行時刻から misfire_grace_seconds 以上遅れて開始されるタスクの扱い
+#   run_late: 遅れても実行する
+#   skip:     実行しない
+#   coalesce: 同じタスクの後続の実行が待機中であれば、それに統合して今回分は実行しない
+MISFIRE_POLICIES = ("run_late", "skip", "coalesce")
+
+# タスクタイプごとの同時実行数の既定値
+# play_mp3を1にすることで、再生中に実行時刻が来た曲はディスパッチャで待機し、
+# 再生を開始する時点で遅延（misfire_grace_seconds）が判定される
+DEFAULT_MAX_CONCURRENCY = {"play_mp3": 1, "run_exe": 4}
+# audio.overlap_policyがpreemptの場合のplay_mp3の同時実行数の既定値。
+# 次の曲をディスパッチャで待たせず、すぐにオーディオエンジンに渡して再生中の曲を止めさせる
+PREEMPT_PLAY_CONCURRENCY = 2
+DEFAULT_MISFIRE_GRACE_SECONDS = 60.0
+# 実行時刻の何秒前にタスクの事前準備（ファイルの確認・読み込み）を行うか
+DEFAULT_PREROLL_SECONDS = 2.0
+
+TaskRunner = Callable[[Occurrence], Tuple[bool, str]]
+
+
+class FireRecord(NamedTuple):
+    """タスク1回分の実行記録。"""
+
+    occurrence: Occurrence
+    started_at: datetime  # ワーカーで処理を開始した時刻
+    lateness: float  # 予定時刻からの遅れ（秒）
+    outcome: str  # "executed" / "skipped" / "coalesced"
+    success: bool
+    message: str
+
+
+class TaskDispatcher:
+    """
+    期限に達したタスクをタスクタイプごとのワーカープールへ振り分けて実行する。
+
+    スケジューラスレッドはsubmit()でタスクを渡すだけで、実行の完了を待たない。
+    そのため、前のタスクの実行時間に関係なく、後続のタスクは予定時刻に開始される。
+    """
+
+    def __init__(
+        self,
+        runners: Dict[str, TaskRunner],
+        max_concurrency: Optional[Dict[str, int]] = None,
+        misfire_grace_seconds: float = DEFAULT_MISFIRE_GRACE_SECONDS,
+        misfire_policy: str = "run_late",
+        on_complete: Optional[Callable[[FireRecord], None]] = None,
+        clock=SYSTEM_CLOCK,
+        inline: bool = False,
+        stagers: Optional[Dict[str, TaskRunner]] = None,
+        preroll_seconds: float = 0.0,
+    ):
+        """
+        Args:
+            runners (Dict[str, TaskRunner]): タスクタイプごとの実行関数。
+                Occurrenceを受け取り (成功/失敗, メッセージ) を返す。
+            max_concurrency (Dict[str, int], optional): タスクタイプごとの同時実行数
+            misfire_grace_seconds (float): 遅延として扱うまでの猶予秒数
+            misfire_policy (str): 猶予を超えて遅れたタスクの扱い（MISFIRE_POLICIES）
+            on_complete (Callable[[FireRecord], None], optional): 実行記録を受け取るコールバック。
+                ワーカースレッドから呼ばれる。
+            clock: 遅延の計測に使う時計（SystemClock/VirtualClock）
+            inline (bool): Trueの場合、ワーカープールを使わずsubmit()の呼び出し元で実行する。
+                仮想時計によるシミュレーションで、実行順と時刻を確定させるために使用する。
+            stagers (Dict[str, TaskRunner], optional): タスクタイプごとの事前準備の関数。
+                実行時刻のpreroll_seconds秒前にstage()から呼ばれ、(成功/失敗, メッセージ) を返す。
+            preroll_seconds (float): 実行時刻の何秒前に事前準備を行うか（0の場合は行わない）
+        """
+        concurrency = {**DEFAULT_MAX_CONCURRENCY, **(max_concurrency or {})}
+        self._runners = runners
+        self._stagers = stagers or {}
+        self.preroll_seconds = preroll_seconds
+        self._pools = {
+            task_type: ThreadPoolExecutor(max_workers=concurrency.get(task_type, 1), thread_name_prefix=f"task-{task_type}")
+            for task_type in runners
+        }
+        self._misfire_grace_seconds = misfire_grace_seconds
+        self._misfire_policy = misfire_policy
+        self._on_complete = on_complete
+        self._clock = clock
+        self._inline = inline
+        self._lock = threading.Lock()
+        self._running = 0
+        # coalesce用: タスク（CompiledTask）ごとの最新の予定時刻
+        self._latest_submitted: dict = {}
+
+    @property
+    def running_count(self) -> int:
+        """実行中（ワーカーで処理中）のタスク数。"""
+        with self._lock:
+            return self._running
+
+    def submit(self, occurrence: Occurrence) -> Optional[Future]:
+        """
+        タスクをワーカープールに投入する。
+
+        Returns:
+            Future: 結果がFireRecordとなるFuture
+            None: 未対応のタスクタイプの場合
+        """
+        pool = self._pools.get(occurrence.task_type)
+        if pool is None:
+            logging.error("未対応のタスクタイプのため実行しません: %s", occurrence.task_type)
+            return None
+        with self._lock:
+            previous = self._latest_submitted.get(occurrence.task)
+            if previous is None or previous < occurrence.datetime:
+                self._latest_submitted[occurrence.task] = occurrence.datetime
+        if self._inline:
+            future: Future = Future()
+            future.set_result(self._run(occurrence))
+            return future
+        return pool.submit(self._run, occurrence)
+
+    def stage(self, occurrence: Occurrence) -> Optional[Future]:
+        """
+        タスクの事前準備をワーカープールで行う。実行時刻に行う処理を最小限にするために使用する。
+
+        Returns:
+            Future: 結果が (成功/失敗, メッセージ) となるFuture
+            None: 事前準備のないタスクタイプの場合
+        """
+        stager = self._stagers.get(occurrence.task_type)
+        pool = self._pools.get(occurrence.task_type)
+        if stager is None or pool is None:
+            return None
+        if self._inline:
+            future: Future = Future()
+            future.set_result(self._stage(stager, occurrence))
+            return future
+        return pool.submit(self._stage, stager, occurrence)
+
+    def _stage(self, stager: TaskRunner, occurrence: Occurrence) -> Tuple[bool, str]:
+        try:
+            success, message = stager(occurrence)
+        except Exception as e:
+            success, message = False, f"事前準備中に予期せぬエラーが発生しました: {e}"
+        if not success:
+            # 失敗しても実行時刻には通常どおり実行を試みる
+            logging.warning(
+                "タスクの事前準備に失敗しました -> [%s] %s: %s", occurrence.task_type, occurrence.task_path, message
+            )
+        return success, message
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        """
+        ワーカープールを終了する。
+
+        Args:
+            wait (bool): 実行中・待機中のタスクの完了を待つ場合True
+            cancel_pending (bool): まだ開始していないタスクを破棄する場合True
+        """
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait, cancel_futures=cancel_pending)
+
+    def _run(self, occurrence: Occurrence) -> FireRecord:
+        started_at = self._clock.now()
+        lateness = (started_at - occurrence.datetime).total_seconds()
+
+        outcome = self._misfire_outcome(occurrence, lateness)
+        if outcome == "skipped":
+            record = FireRecord(occurrence, started_at, lateness, outcome, False, "実行時刻を過ぎたため実行しませんでした。")
+        elif outcome == "coalesced":
+            record = FireRecord(
+                occurrence, started_at, lateness, outcome, False, "後続の実行に統合したため実行しませんでした。"
+            )
+        else:
+            with self._lock:
+                self._running += 1
+            try:
+                success, message = self._runners[occurrence.task_type](occurrence)
+            except Exception as e:
+                success, message = False, f"タスク実行中に予期せぬエラーが発生しました: {e}"
+            finally:
+                with self._lock:
+                    self._running -= 1
+            record = FireRecord(occurrence, started_at, lateness, outcome, success, message)
+
+        TASK_FIRES.inc(occurrence.task_type, outcome)
+        FIRE_LATENESS.observe(lateness, occurrence.task_type)
+        if outcome == "executed" and not record.success:
+            TASK_FAILURES.inc(occurrence.task_type)
+        if self._on_complete is not None:
+            try:
+                self._on_complete(record)
+            except Exception as e:
+                logging.error("実行記録の処理中にエラーが発生しました: %s", e, exc_info=True)
+        return record
+
+    def _misfire_outcome(self, occurrence: Occurrence, lateness: float) -> str:
+        if lateness <= self._misfire_grace_seconds or self._misfire_policy == "run_late":
+            return "executed"
+        if self._misfire_policy == "skip":
+            return "skipped"
+        with self._lock:
+            latest = self._latest_submitted.get(occurrence.task)
+        return "coalesced" if latest is not None and latest > occurrence.datetime else "executed"
+
+
+def build_task_dispatcher(
+    config: dict,
+    runners: Dict[str, TaskRunner],
+    on_complete: Optional[Callable[[FireRecord], None]] = None,
+    clock=SYSTEM_CLOCK,
+    inline: bool = False,
+    stagers: Optional[Dict[str, TaskRunner]] = None,
+) -> TaskDispatcher:
+    """
+    設定ファイルの "executor" セクションからTaskDispatcherを生成する。
+
+    不正な値は警告を出して既定値を使用する。
+
+    Args:
+        config (dict): 設定データ
+        runners (Dict[str, TaskRunner]): タスクタイプごとの実行関数
+        on_complete (Callable[[FireRecord], None], optional): 実行記録を受け取るコールバック
+        clock: 遅延の計測に使う時計
+        inline (bool): ワーカープールを使わず呼び出し元で実行する場合True
+        stagers (Dict[str, TaskRunner], optional): タスクタイプごとの事前準備の関数
+
+    Returns:
+        TaskDispatcher: 生成したディスパッチャ
+    """
+    executor_config = config.get("executor", {})
+
+    max_concurrency = {}
+    if config.get("audio", {}).get("overlap_policy") == "preempt":
+        max_concurrency["play_mp3"] = PREEMPT_PLAY_CONCURRENCY
+    for task_type, limit in executor_config.get("max_concurrency", {}).items():
+        if isinstance(limit, int) and not isinstance(limit, bool) and limit >= 1:
+            max_concurrency[task_type] = limit
+        else:
+            logging.warning(f"executor.max_concurrency.{task_type} '{limit}' は不正です。既定値を使用します。")
+
+    grace = executor_config.get("misfire_grace_seconds", DEFAULT_MISFIRE_GRACE_SECONDS)
+    if isinstance(grace, bool) or not isinstance(grace, (int, float)) or grace < 0:
+        logging.warning(f"executor.misfire_grace_seconds '{grace}' は不正です。既定値を使用します。")
+        grace = DEFAULT_MISFIRE_GRACE_SECONDS
+
+    policy = executor_config.get("misfire_policy", "run_late")
+    if policy not in MISFIRE_POLICIES:
+        logging.warning(f"executor.misfire_policy '{policy}' は不正です。'run_late' として扱います。")
+        policy = "run_late"
+
+    preroll = executor_config.get("preroll_seconds", DEFAULT_PREROLL_SECONDS)
+    if isinstance(preroll, bool) or not isinstance(preroll, (int, float)) or preroll < 0:
+        logging.warning(f"executor.preroll_seconds '{preroll}' は不正です。既定値を使用します。")
+        preroll = DEFAULT_PREROLL_SECONDS
+
+    return TaskDispatcher(runners, max_concurrency, float(grace), policy, on_complete, clock, inline, stagers, float(preroll))
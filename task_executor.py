@@ -1,49 +1,620 @@
 # task_executor.py
 
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime
+import importlib
 import os
+import queue
+import signal
 import subprocess
+import sys
+import threading
 import time
+from typing import Callable, Iterable, NamedTuple, Optional, Tuple
 
-try:
-    import pygame
-except ImportError:
-    pygame = None
+from audio_cache import AudioCache
+from metrics import PROCESS_TIMEOUTS, TASK_DURATION
+
+# pygame・psutilは読み込みに時間がかかるため、起動時には読み込まず、初めて必要になった時点で読み込む。
+# run_exeだけのスケジュールではpygameは読み込まれない。
+# psutilはプロセスのCPU時間・メモリ使用量の計測にのみ使用する（なくても動作する）
+_optional_modules: dict = {}
+_optional_modules_lock = threading.Lock()
+
+pygame = None  # _load_pygame()で読み込んだ後に設定される
+
+
+def _import_optional(name: str):
+    """任意の依存モジュールを読み込んで返す。インストールされていない場合はNone。2回目以降は読み込み済みのものを返す。"""
+    with _optional_modules_lock:
+        if name not in _optional_modules:
+            try:
+                _optional_modules[name] = importlib.import_module(name)
+            except ImportError:
+                _optional_modules[name] = None
+        return _optional_modules[name]
+
+
+def _load_pygame():
+    """pygameを読み込んでモジュール変数pygameに設定する。インストールされていない場合はNone。"""
+    global pygame
+    pygame = _import_optional("pygame")
+    return pygame
+
+
+# 再生が重なった場合の動作
+#   queue:   再生中の曲が終わってから次の曲を再生する
+#   preempt: 再生中の曲と待機中の曲を中断し、新しい曲をすぐに再生する
+PLAY_POLICIES = ("queue", "preempt")
+
+
+class AudioEngine:
+    """
+    pygame.mixerを1回だけ初期化し、専用のワーカースレッドで再生を行うオーディオエンジン。
+
+    play()は再生完了を待たずにFutureを返すため、呼び出し元（スケジューラ）は
+    長い曲の再生中もブロックされない。Futureの結果は (成功/失敗, メッセージ) のタプル。
+    """
+
+    def __init__(self, default_policy: str = "queue", poll_interval: float = 0.1, cache: Optional[AudioCache] = None):
+        """
+        Args:
+            default_policy (str): play()でpolicyを省略した場合の重複時の動作（PLAY_POLICIES）
+            poll_interval (float): 再生終了を確認する間隔（秒）。ワーカースレッド内でのみ使用する。
+            cache (AudioCache, optional): デコード済みの音声のキャッシュ。Noneの場合は毎回ファイルから再生する。
+        """
+        self.default_policy = default_policy
+        self.cache = cache
+        self._poll_interval = poll_interval
+        self._queue: queue.Queue = queue.Queue()
+        # preempt/stopのたびに増やし、それ以前に予約された再生を中断対象とする
+        self._generation = 0
+        self._interrupt = threading.Event()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        # stage()で読み込み済みの (ファイルのパス, Sound)。1曲分のみ保持する（ワーカースレッドからのみ参照する）
+        self._staged: Optional[tuple] = None
+
+    def play(
+        self,
+        file_path: str,
+        on_complete: Optional[Callable[[bool, str], None]] = None,
+        policy: Optional[str] = None,
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> Future:
+        """
+        MP3ファイルの再生を予約し、直ちにFutureを返す。
+
+        Args:
+            file_path (str): 再生するMP3ファイルのパス
+            on_complete (Callable[[bool, str], None], optional): 再生終了時に
+                (成功/失敗, メッセージ) を受け取るコールバック。ワーカースレッドから呼ばれる。
+            policy (str, optional): 再生が重なった場合の動作（PLAY_POLICIES）。省略時はdefault_policy。
+            on_start (Callable[[], None], optional): 再生を開始した直後に呼ばれるコールバック。
+                ワーカースレッドから呼ばれる。開始時刻は呼び出し側の時計で取得する。
+
+        Returns:
+            Future: 結果が (成功/失敗, メッセージ) となるFuture
+        """
+        future: Future = Future()
+        if on_complete is not None:
+            future.add_done_callback(lambda f: on_complete(*f.result()))
+
+        if not os.path.exists(file_path):
+            future.set_result((False, f"再生対象のMP3ファイルが見つかりません: {file_path}"))
+            return future
+        if not _load_pygame():
+            future.set_result((False, "Pygameライブラリがロードされていません。"))
+            return future
+
+        with self._lock:
+            if (policy or self.default_policy) == "preempt":
+                self._cancel_pending("新しい再生により中断されました。", keep=file_path)
+            self._ensure_worker()
+            self._queue.put((self._play_blocking, (file_path, on_start), future, self._generation))
+        return future
+
+    def stage(self, file_path: str) -> Future:
+        """
+        再生の準備として、ファイルを読み込んだSoundを用意しておく。処理はワーカースレッドで行う。
+
+        mixerの初期化とデコード（キャッシュがあればPCMデータの読み込み）をここで済ませるため、
+        続くplay()では再生を開始するだけとなる。
+        デコード済みのSoundは1曲分で数十MBになるため、準備しておくのは最後に指定した1曲だけとする。
+
+        Returns:
+            Future: 結果が (成功/失敗, メッセージ) となるFuture
+        """
+        future: Future = Future()
+        if not os.path.exists(file_path):
+            future.set_result((False, f"再生対象のMP3ファイルが見つかりません: {file_path}"))
+            return future
+        if not _load_pygame():
+            future.set_result((False, "Pygameライブラリがロードされていません。"))
+            return future
+        with self._lock:
+            self._ensure_worker()
+            self._queue.put((self._stage_blocking, file_path, future, self._generation))
+        return future
+
+    def unstage(self, file_path: str):
+        """stage()で準備したSoundを解放する。再生しないことになった場合（実行時刻を過ぎたなど）に呼ぶ。"""
+        with self._lock:
+            if self._worker is not None:
+                self._queue.put((self._unstage_blocking, file_path, Future(), self._generation))
+
+    def prewarm(self, file_paths: Iterable[str]) -> Future:
+        """
+        指定したファイルのデコード結果をキャッシュに用意する。処理はワーカースレッドで行う。
+
+        pygameの読み込みもワーカースレッドで行うため、起動処理がpygameの読み込みを待つことはない。
+
+        Returns:
+            Future: 結果がキャッシュ済みのファイル数となるFuture（キャッシュが無効な場合は0）
+        """
+        future: Future = Future()
+        paths = tuple(path for path in file_paths if os.path.exists(path))
+        if self.cache is None or not paths:
+            future.set_result(0)
+            return future
+        with self._lock:
+            self._ensure_worker()
+            self._queue.put((self._prewarm_blocking, paths, future, self._generation))
+        return future
+
+    def stop(self):
+        """再生中の曲と待機中の曲をすべて中断する。"""
+        with self._lock:
+            self._cancel_pending("再生が停止されました。")
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """再生を中断してワーカースレッドを終了し、mixerを解放する。"""
+        with self._lock:
+            worker = self._worker
+            if worker is None:
+                return
+            self._cancel_pending("オーディオエンジンが終了しました。")
+            self._queue.put(None)
+            self._worker = None
+        worker.join(timeout)
+
+    def _ensure_worker(self):
+        """ワーカースレッドが起動していなければ起動する。ロック取得済みで呼ぶこと。"""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="audio-engine", daemon=True)
+            self._worker.start()
+
+    def _cancel_pending(self, message: str, keep: Optional[str] = None):
+        """
+        待機中の再生を失敗として完了させ、再生中の曲を中断させる。ロック取得済みで呼ぶこと。
+
+        Args:
+            message (str): 中断した再生の結果とするメッセージ
+            keep (str, optional): これから再生するファイルのパス。このファイルの準備（stage）は取り消さない。
+        """
+        self._generation += 1
+        self._interrupt.set()
+        shutdown_requested = False
+        kept_stages = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                shutdown_requested = True
+                break
+            handler, argument, future, _ = item
+            if handler == self._stage_blocking and keep is not None and argument == keep:
+                kept_stages.append((handler, argument, future, self._generation))
+                continue
+            if not future.set_running_or_notify_cancel():
+                continue
+            if handler == self._prewarm_blocking:
+                # キャッシュの準備は取り消す（再生時に改めてデコードする）
+                future.set_result(0)
+            elif handler == self._stage_blocking:
+                future.set_result((False, "再生の準備が中断されました。"))
+            elif handler in (self._unstage_blocking, self._release_staged_blocking):
+                future.set_result(None)
+            else:
+                future.set_result((False, message))
+
+        for item in kept_stages:
+            self._queue.put(item)
+        # 中断した再生のために準備したSoundを解放する（これから再生するファイルの分は残す）
+        if self._worker is not None:
+            self._queue.put((self._release_staged_blocking, keep, Future(), self._generation))
+        if shutdown_requested:
+            # 終了要求は取り消さない
+            self._queue.put(None)
+
+    def _run(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                handler, argument, future, generation = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                future.set_result(handler(argument, generation))
+        finally:
+            self._staged = None
+            if pygame and pygame.mixer.get_init():
+                pygame.mixer.quit()
+
+    def _prewarm_blocking(self, file_paths: Tuple[str, ...], generation: int) -> int:
+        """ワーカースレッド上でキャッシュを用意する。"""
+        if not _load_pygame():
+            return 0
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            return self.cache.prewarm(file_paths)
+        except Exception:
+            return 0
+
+    def _load_cached_sound(self, file_path: str):
+        """キャッシュからSoundを作成する。キャッシュが無効な場合・失敗した場合はNone（ファイルから再生する）。"""
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.load_sound(file_path)
+        except Exception:
+            return None
+
+    def _stage_blocking(self, file_path: str, generation: int) -> Tuple[bool, str]:
+        """ワーカースレッド上で再生の準備を行う。"""
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            sound = self._load_cached_sound(file_path)
+            if sound is None:
+                sound = pygame.mixer.Sound(file_path)
+        except Exception as e:
+            return False, f"再生の準備中にエラーが発生しました: {e}"
+        self._staged = (file_path, sound)
+        return True, "再生の準備ができました。"
+
+    def _unstage_blocking(self, file_path: str, generation: int):
+        """ワーカースレッド上で、file_pathについて準備済みのSoundを解放する。"""
+        if self._staged is not None and self._staged[0] == file_path:
+            self._staged = None
+
+    def _release_staged_blocking(self, keep: Optional[str], generation: int):
+        """ワーカースレッド上で、keep以外のファイルについて準備済みのSoundを解放する。keepがNoneの場合は曲を問わず解放する。"""
+        if self._staged is not None and self._staged[0] != keep:
+            self._staged = None
+
+    def _take_staged(self, file_path: str):
+        """file_pathについて準備済みのSoundを取り出す。ない場合はNone。"""
+        if self._staged is None or self._staged[0] != file_path:
+            return None
+        sound = self._staged[1]
+        self._staged = None
+        return sound
+
+    def _play_blocking(self, request: Tuple[str, Optional[Callable[[], None]]], generation: int) -> Tuple[bool, str]:
+        """ワーカースレッド上で1曲を再生し、終了（または中断）まで待機する。"""
+        file_path, on_start = request
+        if generation != self._generation:
+            self._take_staged(file_path)
+            return False, "再生が中断されました。"
+        started = time.perf_counter()
+        try:
+            # mixerは初回（またはエラーで解放した後）のみ初期化する
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+
+            # 準備済みのSound、キャッシュしたPCMデータ、ファイルからのストリーミングの順に使う
+            sound = self._take_staged(file_path)
+            if sound is None:
+                sound = self._load_cached_sound(file_path)
+            channel = sound.play() if sound is not None else None
+            if channel is not None:
+                is_busy, stop = channel.get_busy, sound.stop
+            else:
+                pygame.mixer.music.load(file_path)
+                pygame.mixer.music.play()
+                is_busy, stop = pygame.mixer.music.get_busy, pygame.mixer.music.stop
+            if on_start is not None:
+                try:
+                    on_start()
+                except Exception:
+                    # 通知の失敗で再生を止めない
+                    pass
+
+            while is_busy():
+                if generation != self._generation:
+                    stop()
+                    return False, "再生が中断されました。"
+                if self._interrupt.wait(self._poll_interval):
+                    self._interrupt.clear()
+
+            return True, "再生が正常に完了しました。"
+        except Exception as e:
+            # エラーが発生した場合はmixerを解放し、次回の再生時に初期化し直す
+            self._staged = None
+            if pygame.mixer.get_init():
+                pygame.mixer.quit()
+            return False, f"MP3再生中に予期せぬエラーが発生しました: {e}"
+        finally:
+            TASK_DURATION.observe(time.perf_counter() - started, "play_mp3")
+
+
+_audio_engine: Optional[AudioEngine] = None
+_audio_engine_lock = threading.Lock()
+
+
+def get_audio_engine() -> AudioEngine:
+    """プロセス全体で共有するAudioEngineを返す。"""
+    global _audio_engine
+    with _audio_engine_lock:
+        if _audio_engine is None:
+            _audio_engine = AudioEngine()
+        return _audio_engine
 
 
 def play_mp3_safely(file_path: str) -> (bool, str):
-    if not pygame:
-        return False, "Pygameライブラリがロードされていません。"
-    if not os.path.exists(file_path):
-        return False, f"再生対象のMP3ファイルが見つかりません: {file_path}"
+    """
+    指定されたMP3ファイルを再生し、再生が終わるまで待機する。
 
-    try:
-        # --- 再生処理の初期化 ---
-        # 毎回mixerを初期化することで、前回の影響をなくす
-        pygame.mixer.init()
-        pygame.mixer.music.load(file_path)
+    再生は共有のAudioEngineで行うため、mixerの初期化は初回のみとなる。
+    スケジューラからはブロックしないget_audio_engine().play()を使用する。
 
-        # --- 再生の開始と待機 ---
-        pygame.mixer.music.play()
+    Returns:
+        (bool, str): (成功/失敗, メッセージ) のタプル
+    """
+    return get_audio_engine().play(file_path).result()
 
-        # ★★★ 最重要：音楽が再生中である間、ここで処理を待機させる ★★★
-        while pygame.mixer.music.get_busy():
-            time.sleep(0.2)  # CPU負荷を抑えつつ待機
 
-        # --- 確実なリソース解放 ---
-        # ループを抜けたら再生終了 or エラーなので、mixerを終了させる
-        pygame.mixer.quit()
+# 制限時間を設定したプロセスの終了を確認する間隔（秒、os.wait4()を使う場合）
+_REAP_POLL_SECONDS = 0.05
 
-        return True, "再生が正常に完了しました。"
-    except Exception as e:
-        # エラーが発生した場合も、可能な限りリソースを解放する
-        if pygame.mixer.get_init():
-            pygame.mixer.quit()
-        return False, f"MP3再生中に予期せぬエラーが発生しました: {e}"
+
+class ProcessRun(NamedTuple):
+    """run_exeで起動したプロセス1回分の実行記録。"""
+
+    pid: int
+    file_path: str
+    started_at: datetime
+    runtime: float  # 実行時間（秒）
+    returncode: Optional[int]
+    timed_out: bool  # 制限時間を超えて強制終了した場合True
+    cpu_seconds: Optional[float]  # CPU時間（計測できない場合はNone）
+    peak_rss: Optional[int]  # 最大常駐メモリ（バイト、計測できない場合はNone）
+
+
+class ProcessSupervisor:
+    """
+    run_exeで起動したプロセスを登録表で管理し、終了を監視するスーパーバイザ。
+
+    プロセスごとに監視スレッドを立てて終了を待ち（ゾンビプロセスを残さない）、
+    制限時間を超えたプロセスは強制終了する。CPU時間と最大メモリ使用量は、
+    POSIXではos.wait4()でプロセスを回収する際にOSから取得し、それ以外（Windows）では
+    psutilが利用可能な場合に監視中に一定間隔で計測する。
+    """
+
+    def __init__(
+        self,
+        max_running: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        sample_interval: float = 1.0,
+        history_size: int = 100,
+    ):
+        """
+        Args:
+            max_running (int, optional): 同時に実行できるプロセス数の上限。Noneの場合は無制限。
+            timeout_seconds (float, optional): 実行時間の上限（秒）。Noneの場合は無制限。
+            sample_interval (float): CPU時間・メモリ使用量を計測する間隔（秒、psutilで計測する場合のみ）
+            history_size (int): 保持する実行記録の件数
+        """
+        self.max_running = max_running
+        self.timeout_seconds = timeout_seconds
+        self.on_exit: Optional[Callable[[ProcessRun], None]] = None
+        self._sample_interval = sample_interval
+        self._lock = threading.Lock()
+        self._running: dict = {}  # pid -> (Popen, 実行ファイルのパス)
+        self._history: deque = deque(maxlen=history_size)
+
+    def launch(self, file_path: str) -> Tuple[bool, str]:
+        """
+        プログラムを起動して監視を開始する。終了は待たない。
+
+        Returns:
+            (bool, str): (成功/失敗, メッセージ) のタプル
+        """
+        with self._lock:
+            if self.max_running is not None and len(self._running) >= self.max_running:
+                return False, f"同時実行数の上限({self.max_running})に達しているため起動しませんでした: {file_path}"
+            proc = subprocess.Popen([file_path])
+            self._running[proc.pid] = (proc, file_path)
+
+        watcher = threading.Thread(
+            target=self._watch, args=(proc, file_path, self.timeout_seconds), name=f"process-{proc.pid}", daemon=True
+        )
+        watcher.start()
+        return True, "プログラムの起動に成功しました。"
+
+    def running_count(self) -> int:
+        """実行中のプロセス数。"""
+        with self._lock:
+            return len(self._running)
+
+    def recent_runs(self) -> list:
+        """終了したプロセスの実行記録を古い順に返す。"""
+        with self._lock:
+            return list(self._history)
+
+    def _watch(self, proc: subprocess.Popen, file_path: str, timeout_seconds: Optional[float]):
+        started_at = datetime.now()
+        started = time.monotonic()
+        deadline = None if timeout_seconds is None else started + timeout_seconds
+        if hasattr(os, "wait4"):
+            timed_out, cpu_seconds, peak_rss = self._wait_rusage(proc, deadline)
+        else:
+            timed_out, cpu_seconds, peak_rss = self._wait_sampled(proc, deadline)
+
+        run = ProcessRun(
+            proc.pid,
+            file_path,
+            started_at,
+            time.monotonic() - started,
+            proc.returncode,
+            timed_out,
+            cpu_seconds,
+            peak_rss,
+        )
+        TASK_DURATION.observe(run.runtime, "run_exe")
+        if timed_out:
+            PROCESS_TIMEOUTS.inc()
+        with self._lock:
+            self._running.pop(proc.pid, None)
+            self._history.append(run)
+        if self.on_exit is not None:
+            self.on_exit(run)
+
+    def _wait_rusage(self, proc: subprocess.Popen, deadline: Optional[float]):
+        """
+        os.wait4()でプロセスの終了を待って回収し、OSが集計したCPU時間・最大メモリを返す（POSIX）。
+
+        制限時間がない場合は終了までブロックし、ある場合は短い間隔で終了を確認する。
+        回収はこのスレッドだけが行う（Popen.wait()・poll()を呼ぶとrusageが取得できなくなる）。
+
+        Returns:
+            (bool, float, int): (強制終了したか, CPU時間, 最大常駐メモリ) のタプル
+        """
+        timed_out = False
+        try:
+            while True:
+                if deadline is None:
+                    _, status, rusage = os.wait4(proc.pid, 0)
+                    break
+                pid, status, rusage = os.wait4(proc.pid, os.WNOHANG)
+                if pid != 0:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # 回収前のためPIDが再利用されることはない
+                    timed_out = True
+                    _kill_process_tree(proc)
+                    _, status, rusage = os.wait4(proc.pid, 0)
+                    break
+                time.sleep(min(_REAP_POLL_SECONDS, remaining))
+        except ChildProcessError:
+            # 他で回収済みの場合は、終了コードだけを記録する
+            proc.wait()
+            return timed_out, None, None
+
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrssの単位はLinuxではKB、macOSではバイト
+        peak_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+        return timed_out, rusage.ru_utime + rusage.ru_stime, peak_rss
+
+    def _wait_sampled(self, proc: subprocess.Popen, deadline: Optional[float]):
+        """
+        プロセスの終了を待ち、psutilが利用可能な場合は一定間隔でCPU時間・メモリ使用量を計測する（Windows）。
+
+        CPU時間は終了前の最後の計測値のため、最大でsample_interval分少なくなる。
+
+        Returns:
+            (bool, float, int): (強制終了したか, CPU時間, 最大常駐メモリ) のタプル（計測できない値はNone）
+        """
+        sampler = None
+        psutil = _import_optional("psutil")
+        if psutil:
+            try:
+                sampler = psutil.Process(proc.pid)
+            except psutil.Error:
+                sampler = None
+        cpu_seconds, peak_rss = None, None
+
+        while True:
+            if sampler is not None:
+                try:
+                    cpu = sampler.cpu_times()
+                    rss = sampler.memory_info().rss
+                    # 両方の計測に成功した場合のみ更新する（片方だけがNoneにならないように）
+                    cpu_seconds = cpu.user + cpu.system
+                    peak_rss = max(peak_rss or 0, rss)
+                except psutil.Error:
+                    sampler = None
+
+            wait_seconds = self._sample_interval if sampler is not None else None
+            if deadline is not None:
+                remaining = max(deadline - time.monotonic(), 0.0)
+                wait_seconds = remaining if wait_seconds is None else min(wait_seconds, remaining)
+            try:
+                proc.wait(timeout=wait_seconds)
+                return False, cpu_seconds, peak_rss
+            except subprocess.TimeoutExpired:
+                if deadline is not None and time.monotonic() >= deadline:
+                    _kill_process_tree(proc)
+                    proc.wait()
+                    return True, cpu_seconds, peak_rss
+
+
+def _kill_process_tree(proc: subprocess.Popen):
+    """プロセスを強制終了する。psutilが利用可能な場合は子プロセスも終了させる。"""
+    children = []
+    psutil = _import_optional("psutil")
+    if psutil:
+        try:
+            children = psutil.Process(proc.pid).children(recursive=True)
+        except psutil.Error:
+            children = []
+    if hasattr(os, "wait4"):
+        # Popen.kill()は内部でpoll()を呼び、プロセスを回収してしまうことがあるため、シグナルを直接送る
+        os.kill(proc.pid, signal.SIGKILL)
+    else:
+        proc.kill()
+    for child in children:
+        try:
+            child.kill()
+        except psutil.Error:
+            pass
+
+
+_process_supervisor: Optional[ProcessSupervisor] = None
+_process_supervisor_lock = threading.Lock()
+
+
+def get_process_supervisor() -> ProcessSupervisor:
+    """プロセス全体で共有するProcessSupervisorを返す。"""
+    global _process_supervisor
+    with _process_supervisor_lock:
+        if _process_supervisor is None:
+            _process_supervisor = ProcessSupervisor()
+        return _process_supervisor
+
+
+def stage_exe(file_path: str) -> (bool, str):
+    """
+    EXEの実行の準備として、ファイルが存在し実行できることを確認する。
+
+    実行時刻より前に確認しておくことで、問題があれば早めにログに記録できる。
+    ファイルのメタデータはOSにキャッシュされるため、実行時の確認も短時間で済む。
+
+    Returns:
+        (bool, str): (成功/失敗, メッセージ) のタプル
+    """
+    if not os.path.exists(file_path):
+        return False, f"実行対象のファイルが見つかりません: {file_path}"
+    if not os.path.isfile(file_path) or os.path.getsize(file_path) == 0:
+        return False, f"実行対象がファイルではないか、空のファイルです: {file_path}"
+    if not os.access(file_path, os.X_OK):
+        return False, f"ファイルの実行権限がありません: {file_path}"
+    return True, "実行の準備ができました。"
 
 
 def run_exe(file_path: str) -> (bool, str):
     """
     指定されたEXEファイルを非同期で実行する。
+
+    起動したプロセスは共有のProcessSupervisorが終了まで監視する。
+
     Returns:
         (bool, str): (成功/失敗, メッセージ) のタプル
     """
@@ -51,8 +622,7 @@ def run_exe(file_path: str) -> (bool, str):
         return False, f"実行対象のファイルが見つかりません: {file_path}"
 
     try:
-        subprocess.Popen([file_path])
-        return True, "プログラムの起動に成功しました。"
+        return get_process_supervisor().launch(file_path)
     except PermissionError:
         return False, f"ファイルの実行権限がありません: {file_path}"
     except Exception as e:
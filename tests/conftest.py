@@ -0,0 +1,7 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# アプリケーションのモジュールはリポジトリ直下に置かれているため、テストから読み込めるようにする
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
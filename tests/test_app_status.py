@@ -0,0 +1,38 @@
+# tests/test_app_status.py
+
+from types import MappingProxyType
+
+import pytest
+
+from app_status import StatusBoard
+
+
+def test_publish_creates_a_new_snapshot_and_keeps_the_old_one():
+    board = StatusBoard()
+    before = board.snapshot()
+
+    after = board.publish(status="監視中", pending_task_count=3)
+
+    assert before.version == 0 and before.status == "初期化中..."
+    assert after.version == 1 and after.status == "監視中" and after.pending_task_count == 3
+    assert board.snapshot() is after
+
+
+def test_publish_freezes_lists_and_dicts():
+    board = StatusBoard()
+
+    snapshot = board.publish(full_schedule_for_ui=[1, 2], config={"audio": {}})
+
+    assert snapshot.full_schedule_for_ui == (1, 2)
+    assert isinstance(snapshot.config, MappingProxyType)
+    with pytest.raises(TypeError):
+        snapshot.config["audio"] = None
+
+
+def test_changed_since_reports_only_newer_versions():
+    board = StatusBoard()
+    version = board.version
+
+    assert board.changed_since(version) is None
+    board.publish(status="待機中")
+    assert board.changed_since(version).status == "待機中"
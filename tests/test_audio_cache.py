@@ -0,0 +1,43 @@
+# tests/test_audio_cache.py
+
+import os
+
+from audio_cache import AudioCache
+
+
+def _add_entry(directory, key, pcm_bytes, last_used):
+    pcm_path = os.path.join(directory, key + ".pcm")
+    meta_path = os.path.join(directory, key + ".json")
+    with open(pcm_path, "wb") as f:
+        f.write(b"\0" * pcm_bytes)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        f.write("{}")
+    os.utime(meta_path, (last_used, last_used))
+    return meta_path
+
+
+def test_evict_removes_least_recently_used_entries_until_within_budget(tmp_path):
+    directory = str(tmp_path)
+    _add_entry(directory, "old", 400, 1_000)
+    _add_entry(directory, "middle", 400, 2_000)
+    _add_entry(directory, "new", 400, 3_000)
+
+    AudioCache(directory, max_bytes=800).evict()
+
+    assert sorted(os.listdir(directory)) == ["middle.json", "middle.pcm", "new.json", "new.pcm"]
+
+
+def test_evict_keeps_the_entry_just_stored(tmp_path):
+    directory = str(tmp_path)
+    keep = _add_entry(directory, "just_stored", 400, 1_000)
+    _add_entry(directory, "other", 400, 2_000)
+
+    AudioCache(directory, max_bytes=400).evict(keep=keep)
+
+    assert sorted(os.listdir(directory)) == ["just_stored.json", "just_stored.pcm"]
+
+
+def test_evict_without_cache_directory_does_nothing(tmp_path):
+    AudioCache(str(tmp_path / "missing"), max_bytes=0).evict()
+
+    assert not (tmp_path / "missing").exists()
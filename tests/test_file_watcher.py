@@ -0,0 +1,59 @@
+# tests/test_file_watcher.py
+
+import os
+import threading
+
+from file_watcher import FileWatcher
+
+
+def _touch(path, text, mtime):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_check_reports_only_changed_files(tmp_path):
+    watched = tmp_path / "config.json"
+    other = tmp_path / "holidays.csv"
+    _touch(watched, "{}", 1_000_000)
+    _touch(other, "", 1_000_000)
+    watcher = FileWatcher([str(watched), str(other)], lambda changed: None)
+
+    assert watcher.check() == []
+    _touch(watched, "{ }", 2_000_000)
+
+    assert watcher.check() == [str(watched)]
+    assert watcher.check() == []
+
+
+def test_check_reports_a_created_file(tmp_path):
+    path = tmp_path / "holidays.csv"
+    watcher = FileWatcher([str(path)], lambda changed: None)
+
+    _touch(path, "2025-06-16\n", 1_000_000)
+
+    assert watcher.check() == [str(path)]
+
+
+def test_watcher_keeps_running_after_the_callback_fails(tmp_path):
+    path = tmp_path / "config.json"
+    _touch(path, "{}", 1_000_000)
+    calls = []
+    called = [threading.Event(), threading.Event()]
+
+    def on_change(changed):
+        calls.append(changed)
+        called[len(calls) - 1].set()
+        raise TypeError("broken config")
+
+    watcher = FileWatcher([str(path)], on_change, interval_seconds=0.01)
+    watcher.start()
+    try:
+        _touch(path, "{ }", 2_000_000)
+        assert called[0].wait(5)
+        _touch(path, "{  }", 3_000_000)
+
+        assert called[1].wait(5)
+    finally:
+        watcher.stop()
+
+    assert calls == [[str(path)], [str(path)]]
@@ -0,0 +1,58 @@
+# tests/test_log_pipeline.py
+
+import logging
+import logging.handlers
+
+import pytest
+
+from log_pipeline import DEFAULT_BACKUP_COUNT, DEFAULT_MAX_BYTES, build_file_handler, start_logging, stop_logging
+
+
+@pytest.fixture
+def root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_file_handler_rotates_by_size_by_default(tmp_path):
+    handler = build_file_handler(str(tmp_path / "app.log"), {"max_bytes": 1024, "backup_count": 3})
+    try:
+        assert isinstance(handler, logging.handlers.RotatingFileHandler)
+        assert (handler.maxBytes, handler.backupCount) == (1024, 3)
+    finally:
+        handler.close()
+
+
+def test_file_handler_rotates_by_time_when_rotate_when_is_given(tmp_path):
+    handler = build_file_handler(str(tmp_path / "app.log"), {"rotate_when": "midnight"})
+    try:
+        assert isinstance(handler, logging.handlers.TimedRotatingFileHandler)
+        assert handler.backupCount == DEFAULT_BACKUP_COUNT
+    finally:
+        handler.close()
+
+
+@pytest.mark.parametrize("settings", [{"max_bytes": 0, "backup_count": 0}, {"max_bytes": "1MB", "backup_count": True}])
+def test_file_handler_replaces_invalid_values_with_defaults(tmp_path, settings):
+    handler = build_file_handler(str(tmp_path / "app.log"), settings)
+    try:
+        assert (handler.maxBytes, handler.backupCount) == (DEFAULT_MAX_BYTES, DEFAULT_BACKUP_COUNT)
+    finally:
+        handler.close()
+
+
+def test_stop_logging_flushes_the_queue_and_can_be_called_again(tmp_path, root_logger):
+    log_path = tmp_path / "app.log"
+    listener = start_logging(str(log_path))
+    root_logger.info("queued message")
+
+    stop_logging(listener)
+    stop_logging(listener)
+
+    assert "queued message" in log_path.read_text(encoding="utf-8")
@@ -0,0 +1,164 @@
+# tests/test_main_app.py
+
+import json
+from datetime import datetime
+
+import pytest
+
+import main_app
+from clock import VirtualClock
+from file_watcher import FileWatcher
+from metrics import CONFIG_RELOADS
+from schedule_calculator import Occurrence
+from schedule_set import load_schedule_set
+from timer_queue import TimerQueue
+
+
+def _config(times, holiday_file="holidays.csv"):
+    return {
+        "schedule_period": {"start_date": "2025-06-13", "end_date": "2025-06-20"},
+        "holiday_list_path": holiday_file,
+        "daily_schedules": [{"time": t, "task_type": "run_exe", "task_path": "task.exe"} for t in times],
+    }
+
+
+@pytest.fixture
+def base_path(tmp_path):
+    (tmp_path / "holidays.csv").write_text("2025-06-16\n", encoding="utf-8")
+    return str(tmp_path)
+
+
+def _start_timer(config, base_path, now):
+    timer = TimerQueue(clock=VirtualClock(now))
+    schedule_set = load_schedule_set(config, base_path + "/config.json")
+    window = main_app.MergedScheduleWindow(schedule_set.schedules, now)
+    main_app._start_day(window, timer, now)
+    return timer
+
+
+def test_run_simulation_fires_each_task_once(base_path):
+    fires = main_app.run_simulation(
+        _config(["08:20:00", "12:20:00"]), base_path, datetime(2025, 6, 13), datetime(2025, 6, 20, 23, 59, 59)
+    )
+
+    # 6/13, 6/17～6/20 の5日 x 2件（土日と休日の6/16を除く）
+    assert len(fires) == 10
+    assert len({record.occurrence.datetime for record in fires}) == 10
+    assert all(record.outcome == "executed" and record.lateness == 0 for record in fires)
+
+
+def test_run_simulation_with_missing_holiday_file_finishes(base_path):
+    fires = main_app.run_simulation(
+        _config(["08:20:00", "12:20:00"], "missing.csv"), base_path, datetime(2025, 6, 13), datetime(2025, 6, 17, 23, 59, 59)
+    )
+
+    # 休日リストがない場合は土日のみを除く（6/13, 6/16, 6/17）
+    assert [record.occurrence.datetime.day for record in fires] == [13, 13, 16, 16, 17, 17]
+
+
+def test_run_simulation_jumps_straight_to_the_next_event(base_path, monkeypatch):
+    waits = []
+    original_wait = VirtualClock.wait
+
+    def counting_wait(clock, condition, timeout):
+        waits.append(timeout)
+        original_wait(clock, condition, timeout)
+
+    monkeypatch.setattr(VirtualClock, "wait", counting_wait)
+
+    main_app.run_simulation(_config(["08:20:00"]), base_path, datetime(2025, 6, 13), datetime(2025, 6, 20, 23, 59, 59))
+
+    # 10分ごとに刻まず、次のイベント（日の開始・スケジュール表示・タスク）まで一度に進める
+    assert len(waits) < 30
+
+
+def test_schedule_reload_applies_only_the_difference(base_path):
+    now = datetime(2025, 6, 13, 9, 0)
+    timer = _start_timer(_config(["10:00:00", "11:00:00"]), base_path, now)
+    kept_entry = [entry for entry in timer.items() if isinstance(entry[1], Occurrence) and entry[0].hour == 10]
+
+    new_config = _config(["10:00:00", "12:00:00"])
+    reload = main_app.ScheduleReload(new_config, load_schedule_set(new_config, base_path + "/config.json"))
+    main_app._apply_schedule_reload(reload, timer, now)
+
+    pending = [when for when, item in timer.items() if isinstance(item, Occurrence)]
+    assert [when.hour for when in pending] == [10, 12]
+    # 変わらないタスクは登録されたまま残る
+    assert [entry for entry in timer.items() if entry in kept_entry] == kept_entry
+
+
+def test_schedule_reload_removes_preroll_of_removed_tasks(base_path):
+    now = datetime(2025, 6, 13, 9, 0)
+    timer = TimerQueue(clock=VirtualClock(now))
+    schedule_set = load_schedule_set(_config(["10:00:00"]), base_path + "/config.json")
+    main_app._start_day(main_app.MergedScheduleWindow(schedule_set.schedules, now), timer, now, preroll_seconds=2.0)
+    assert any(isinstance(item, main_app.PreRoll) for _, item in timer.items())
+
+    new_config = _config(["11:00:00"])
+    reload = main_app.ScheduleReload(new_config, load_schedule_set(new_config, base_path + "/config.json"))
+    main_app._apply_schedule_reload(reload, timer, now, preroll_seconds=2.0)
+
+    prerolls = [item.occurrence.datetime.hour for _, item in timer.items() if isinstance(item, main_app.PreRoll)]
+    assert prerolls == [11]
+
+
+def test_schedule_reload_while_idle_reschedules_the_next_day(base_path):
+    now = datetime(2025, 6, 13, 18, 0)
+    timer = _start_timer(_config(["10:00:00"]), base_path, now)
+    assert timer.items() == []
+
+    new_config = _config(["10:00:00"])
+    reload = main_app.ScheduleReload(new_config, load_schedule_set(new_config, base_path + "/config.json"))
+    main_app._apply_schedule_reload(reload, timer, now)
+
+    # 待機中の再読込では、次回のタスクがある日（6/17）の開始イベントを登録し直す
+    assert timer.items() == [(datetime(2025, 6, 17), main_app.EVENT_DAY_START)]
+
+
+def test_reload_that_raises_keeps_the_current_schedule(base_path, monkeypatch):
+    config_path = base_path + "/config.json"
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(_config(["10:00:00"]), f)
+
+    def broken(config, path):
+        raise TypeError("broken schedule")
+
+    monkeypatch.setattr(main_app, "load_schedule_set", broken)
+    timer = TimerQueue(clock=VirtualClock(datetime(2025, 6, 13, 9, 0)))
+    before = CONFIG_RELOADS.value("failure")
+
+    main_app._reload_files(config_path, base_path, timer, FileWatcher([], lambda changed: None), [config_path])
+
+    assert CONFIG_RELOADS.value("failure") == before + 1
+    assert timer.items() == []
+
+
+def test_run_simulation_fires_tasks_at_midnight(base_path):
+    fires = main_app.run_simulation(
+        _config(["00:00:00", "09:00:00"]), base_path, datetime(2025, 6, 13), datetime(2025, 6, 20, 23, 59, 59)
+    )
+
+    # 日の開始イベント（0:00）と同時刻のタスクも実行する
+    midnight = [record.occurrence.datetime.day for record in fires if record.occurrence.datetime.hour == 0]
+    assert midnight == [13, 17, 18, 19, 20]
+    assert len(fires) == 10
+
+
+def test_parse_args_converts_simulation_dates():
+    args = main_app.parse_args(["--simulate", "2025-06-13", "2025-06-20"])
+
+    # 終了日を日付のみで指定した場合は、その日の終わりまでを対象とする
+    assert args.simulate == (datetime(2025, 6, 13), datetime(2025, 6, 20, 23, 59, 59, 999999))
+
+
+def test_parse_args_keeps_the_time_of_the_simulation_end():
+    args = main_app.parse_args(["--simulate", "2025-06-13T08:00:00", "2025-06-13T12:00:00"])
+
+    assert args.simulate == (datetime(2025, 6, 13, 8), datetime(2025, 6, 13, 12))
+
+
+def test_parse_args_rejects_a_malformed_simulation_date(capsys):
+    with pytest.raises(SystemExit):
+        main_app.parse_args(["--simulate", "2025/06/13", "2025-06-20"])
+
+    assert "日時の形式が不正です" in capsys.readouterr().err
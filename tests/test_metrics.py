@@ -0,0 +1,57 @@
+# tests/test_metrics.py
+
+from metrics import MetricsRegistry
+
+
+def test_counter_is_rendered_per_label():
+    registry = MetricsRegistry()
+    fires = registry.counter("fires_total", "実行回数", ("task_type",))
+    fires.inc("play_mp3")
+    fires.inc("play_mp3")
+    fires.inc("run_exe")
+
+    text = registry.render_prometheus()
+
+    assert "# TYPE fires_total counter" in text
+    assert 'fires_total{task_type="play_mp3"} 2.0' in text
+    assert 'fires_total{task_type="run_exe"} 1.0' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    lateness = registry.histogram("lateness_seconds", "遅延", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        lateness.observe(value)
+
+    text = registry.render_prometheus()
+
+    assert 'lateness_seconds_bucket{le="0.1"} 1' in text
+    assert 'lateness_seconds_bucket{le="1.0"} 2' in text
+    assert 'lateness_seconds_bucket{le="+Inf"} 3' in text
+    assert "lateness_seconds_sum 5.55" in text
+    assert "lateness_seconds_count 3" in text
+
+
+def test_registering_the_same_name_returns_the_existing_metric():
+    registry = MetricsRegistry()
+
+    assert registry.counter("fires_total", "実行回数") is registry.counter("fires_total", "実行回数")
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("paths_total", "パス", ("path",)).inc('C:\\a "b"')
+
+    assert 'paths_total{path="C:\\\\a \\"b\\""} 1.0' in registry.render_prometheus()
+
+
+def test_gauges_and_json_output():
+    registry = MetricsRegistry()
+    registry.counter("fires_total", "実行回数").inc()
+    registry.add_gauge_source(lambda: {"pending_tasks": ("未実行タスク数", 4)})
+
+    data = registry.to_dict()
+
+    assert data["fires_total"]["values"] == [{"labels": {}, "value": 1.0}]
+    assert data["pending_tasks"] == {"type": "gauge", "help": "未実行タスク数", "values": [{"labels": {}, "value": 4}]}
+    assert "pending_tasks 4" in registry.render_prometheus()
@@ -0,0 +1,133 @@
+# tests/test_schedule_calculator.py
+
+import os
+from datetime import date, datetime
+
+import pytest
+
+from metrics import HOLIDAY_LOADS
+from schedule_calculator import NO_HOLIDAYS, ScheduleWindow, compile_schedule, iter_schedule, load_holiday_index
+
+
+def _config(holiday_file="holidays.csv", start="2025-06-13", end="2025-06-20"):
+    return {
+        "schedule_period": {"start_date": start, "end_date": end},
+        "holiday_list_path": holiday_file,
+        "daily_schedules": [
+            {"time": "12:20:00", "task_type": "run_exe", "task_path": "noon.exe"},
+            {"time": "08:20:00", "task_type": "play_mp3", "task_path": "morning.mp3"},
+        ],
+    }
+
+
+def _write_holidays(path, lines, mtime):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    # 書き換えが同じ時刻・サイズにならないよう、更新日時を明示する
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def schedule_dir(tmp_path):
+    _write_holidays(tmp_path / "holidays.csv", ["2025-06-16"], 1_000_000)
+    return tmp_path
+
+
+def test_iter_schedule_skips_weekends_and_holidays(schedule_dir):
+    schedule = compile_schedule(_config(), str(schedule_dir))
+
+    days = sorted({o.datetime.date() for o in iter_schedule(schedule)})
+
+    # 6/14・6/15は土日、6/16は休日
+    assert days == [date(2025, 6, 13), date(2025, 6, 17), date(2025, 6, 18), date(2025, 6, 19), date(2025, 6, 20)]
+
+
+def test_iter_schedule_orders_tasks_by_time(schedule_dir):
+    schedule = compile_schedule(_config(), str(schedule_dir))
+
+    first_day = [o for o in iter_schedule(schedule) if o.datetime.date() == date(2025, 6, 13)]
+
+    assert [o.task_path for o in first_day] == ["morning.mp3", "noon.exe"]
+
+
+def test_missing_holiday_file_returns_the_shared_empty_index(tmp_path):
+    path = str(tmp_path / "missing.csv")
+    before = HOLIDAY_LOADS.value("missing")
+
+    first = load_holiday_index(path)
+    second = load_holiday_index(path)
+
+    assert first is NO_HOLIDAYS
+    assert second is NO_HOLIDAYS
+    assert HOLIDAY_LOADS.value("missing") == before + 1
+
+
+def test_holiday_index_is_reloaded_only_when_the_file_changes(schedule_dir):
+    path = schedule_dir / "holidays.csv"
+
+    first = load_holiday_index(str(path))
+    assert load_holiday_index(str(path)) is first
+
+    _write_holidays(path, ["2025-06-16", "2025-06-17"], 2_000_000)
+    second = load_holiday_index(str(path))
+
+    assert second == {date(2025, 6, 16).toordinal(), date(2025, 6, 17).toordinal()}
+
+
+def test_window_rolls_over_to_the_next_run_day(schedule_dir):
+    window = ScheduleWindow(compile_schedule(_config(), str(schedule_dir)), datetime(2025, 6, 13, 9, 0))
+
+    upcoming = window.upcoming(datetime(2025, 6, 13, 13, 0), 2)
+
+    # 金曜の最後のタスクを過ぎると、土日と休日を飛ばして火曜のタスクになる
+    assert [o.datetime for o in upcoming] == [datetime(2025, 6, 17, 8, 20), datetime(2025, 6, 17, 12, 20)]
+    assert window.for_day(date(2025, 6, 17), datetime(2025, 6, 17, 9, 0))[0].datetime == datetime(2025, 6, 17, 12, 20)
+
+
+def test_window_restart_excludes_a_task_at_exactly_now(schedule_dir):
+    window = ScheduleWindow(compile_schedule(_config(), str(schedule_dir)), datetime(2025, 6, 13, 9, 0))
+    now = datetime(2025, 6, 13, 12, 20)
+
+    # 先読みしていない状態で問い合わせると、現在時刻から展開し直す。同時刻のタスクは実行済みとして扱う
+    assert [o.datetime for o in window.upcoming(now, 1)] == [datetime(2025, 6, 17, 8, 20)]
+
+
+def test_window_reflects_a_holiday_list_change(schedule_dir):
+    window = ScheduleWindow(compile_schedule(_config(), str(schedule_dir)), datetime(2025, 6, 13, 13, 0))
+    assert window.next_after(datetime(2025, 6, 13, 13, 0)).datetime.date() == date(2025, 6, 17)
+
+    _write_holidays(schedule_dir / "holidays.csv", ["2025-06-16", "2025-06-17"], 3_000_000)
+
+    assert window.next_after(datetime(2025, 6, 13, 13, 0)).datetime.date() == date(2025, 6, 18)
+
+
+def test_window_with_missing_holiday_file_does_not_return_past_tasks(tmp_path):
+    window = ScheduleWindow(compile_schedule(_config("missing.csv"), str(tmp_path)), datetime(2025, 6, 13, 7, 0))
+
+    for now in (datetime(2025, 6, 13, 8, 20), datetime(2025, 6, 13, 12, 20)):
+        next_task = window.next_after(now)
+        assert next_task.datetime > now
+
+    assert window.next_after(datetime(2025, 6, 13, 12, 20)).datetime == datetime(2025, 6, 16, 8, 20)
+
+
+def test_compile_schedule_skips_malformed_entries(schedule_dir, capsys):
+    config = _config()
+    config["daily_schedules"] = [
+        "10:00",
+        {"time": 800, "task_type": "run_exe", "task_path": "a.exe"},
+        {"time": "09:00:00", "task_type": "run_exe", "task_path": 5},
+        {"time": "09:30:00", "task_type": "run_exe", "task_path": "ok.exe"},
+    ]
+
+    schedule = compile_schedule(config, str(schedule_dir))
+
+    assert [task.task_path for task in schedule.tasks] == ["ok.exe"]
+    # 不正なエントリはそれぞれ1回だけ報告する
+    assert capsys.readouterr().out.count("警告: daily_schedules内のタスク定義が不正") == 3
+
+
+def test_compile_schedule_rejects_daily_schedules_that_is_not_a_list(schedule_dir):
+    config = _config()
+    config["daily_schedules"] = {"time": "10:00:00", "task_type": "run_exe", "task_path": "a.exe"}
+
+    assert compile_schedule(config, str(schedule_dir)) is None
@@ -0,0 +1,67 @@
+# tests/test_schedule_numpy.py
+
+from datetime import date, datetime
+
+import pytest
+
+import schedule_numpy
+from schedule_calculator import compile_schedule, iter_schedule, occurrence_times
+
+
+def _config():
+    return {
+        "schedule_period": {"start_date": "2025-06-01", "end_date": "2025-08-31"},
+        "holiday_list_path": "holidays.csv",
+        "daily_schedules": [
+            {"time": "17:00:00", "task_type": "run_exe", "task_path": "evening.exe"},
+            {"time": "08:20:00", "task_type": "play_mp3", "task_path": "morning.mp3"},
+            {"time": "08:20:00", "task_type": "run_exe", "task_path": "morning.exe"},
+        ],
+    }
+
+
+@pytest.fixture
+def schedule(tmp_path):
+    (tmp_path / "holidays.csv").write_text("2025-07-21\n2025-08-11\n", encoding="utf-8")
+    return compile_schedule(_config(), str(tmp_path))
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [
+        (None, None),
+        (datetime(2025, 7, 18, 8, 20), datetime(2025, 7, 22, 8, 20)),
+        (datetime(2025, 7, 18, 12, 0), None),
+    ],
+)
+def test_occurrence_times_matches_iter_schedule(schedule, start, end):
+    expected = [o.datetime for o in iter_schedule(schedule, start=start, end=end)]
+
+    times = occurrence_times(schedule, start, end)
+
+    assert times == expected
+    assert all(type(t) is datetime for t in times)
+
+
+def test_occurrence_times_without_numpy_returns_the_same_list(schedule, monkeypatch):
+    expected = occurrence_times(schedule)
+    monkeypatch.setattr(schedule_numpy, "np", None)
+
+    assert occurrence_times(schedule) == expected
+
+
+def test_occurrence_matrix_has_one_row_per_run_day(schedule):
+    pytest.importorskip("numpy")
+
+    days, times = schedule_numpy.occurrence_matrix(schedule, date(2025, 7, 18), date(2025, 7, 22))
+
+    # 7/19・7/20は土日、7/21は休日
+    assert days.tolist() == [date(2025, 7, 18), date(2025, 7, 22)]
+    assert times.shape == (2, 3)
+
+
+def test_numpy_backend_without_numpy_raises(schedule, monkeypatch):
+    monkeypatch.setattr(schedule_numpy, "np", None)
+
+    with pytest.raises(RuntimeError):
+        schedule_numpy.occurrence_array(schedule)
@@ -0,0 +1,80 @@
+# tests/test_schedule_set.py
+
+import json
+from datetime import date, datetime
+
+from schedule_set import MergedScheduleWindow, load_schedule_set
+
+
+def _entry(name, times, task_path):
+    return {
+        "name": name,
+        "schedule_period": {"start_date": "2025-06-13", "end_date": "2025-06-20"},
+        "holiday_list_path": "holidays.csv",
+        "daily_schedules": [{"time": t, "task_type": "run_exe", "task_path": task_path} for t in times],
+    }
+
+
+def _schedule_set(tmp_path, entries):
+    (tmp_path / "holidays.csv").write_text("2025-06-16\n", encoding="utf-8")
+    config = {"schedules": entries}
+    return load_schedule_set(config, str(tmp_path / "config.json"))
+
+
+def test_single_config_is_loaded_as_one_unnamed_schedule(tmp_path):
+    config = _entry("ignored", ["08:00:00"], "a.exe")
+    del config["name"]
+
+    schedule_set = load_schedule_set(config, str(tmp_path / "config.json"))
+
+    assert [s.name for s in schedule_set.schedules] == [""]
+    assert schedule_set.config_paths == (str(tmp_path / "config.json"),)
+
+
+def test_schedule_entries_can_reference_other_config_files(tmp_path):
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    (sub / "holidays.csv").write_text("", encoding="utf-8")
+    referenced = _entry("unused", ["09:00:00"], "b.exe")
+    (sub / "school.json").write_text(json.dumps(referenced), encoding="utf-8")
+
+    schedule_set = _schedule_set(
+        tmp_path, [_entry("office", ["08:00:00"], "a.exe"), {"name": "school", "config_path": "sub/school.json"}]
+    )
+
+    office, school = schedule_set.schedules
+    assert school.name == "school"
+    # 参照先の相対パスは参照先の設定ファイルのディレクトリを基準に解決する
+    assert school.tasks[0].resolved_path == str(sub / "b.exe")
+    assert str(sub / "school.json") in schedule_set.watch_paths
+    assert len(schedule_set.holiday_paths) == 2
+
+
+def test_duplicate_schedule_names_are_rejected(tmp_path):
+    entries = [_entry("same", ["08:00:00"], "a.exe"), _entry("same", ["09:00:00"], "b.exe")]
+
+    assert _schedule_set(tmp_path, entries) is None
+
+
+def test_merged_window_interleaves_schedules_in_time_order(tmp_path):
+    schedule_set = _schedule_set(
+        tmp_path, [_entry("office", ["08:00:00", "12:00:00"], "a.exe"), _entry("school", ["10:00:00"], "b.exe")]
+    )
+    window = MergedScheduleWindow(schedule_set.schedules, datetime(2025, 6, 13, 7, 0))
+
+    today = window.for_day(date(2025, 6, 13), datetime(2025, 6, 13, 7, 0))
+
+    assert [(o.datetime.hour, o.schedule_name) for o in today] == [(8, "office"), (10, "school"), (12, "office")]
+
+
+def test_merged_window_rolls_over_to_the_next_run_day(tmp_path):
+    schedule_set = _schedule_set(tmp_path, [_entry("office", ["08:00:00"], "a.exe"), _entry("school", ["10:00:00"], "b.exe")])
+    window = MergedScheduleWindow(schedule_set.schedules, datetime(2025, 6, 13, 7, 0))
+
+    upcoming = window.upcoming(datetime(2025, 6, 13, 11, 0), 2)
+
+    # 土日と休日（6/16）を飛ばして6/17になる
+    assert [(o.datetime, o.schedule_name) for o in upcoming] == [
+        (datetime(2025, 6, 17, 8, 0), "office"),
+        (datetime(2025, 6, 17, 10, 0), "school"),
+    ]
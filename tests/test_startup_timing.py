@@ -0,0 +1,38 @@
+# tests/test_startup_timing.py
+
+import logging
+from types import SimpleNamespace
+
+import startup_timing
+from startup_timing import StartupTimer
+
+
+def _fake_perf_counter(monkeypatch, values):
+    values = iter(values)
+    monkeypatch.setattr(startup_timing, "time", SimpleNamespace(perf_counter=lambda: next(values)))
+
+
+def test_phases_cover_the_whole_startup_without_gaps(monkeypatch):
+    _fake_perf_counter(monkeypatch, [10.5, 10.75, 12.0])
+    timer = StartupTimer(started=10.0)
+
+    assert timer.mark("imports") == 0.5
+    assert timer.mark("config") == 0.25
+    assert timer.mark("first_wait") == 1.25
+
+    assert timer.phases == (("imports", 0.5), ("config", 0.25), ("first_wait", 1.25))
+    assert timer.total == sum(elapsed for _, elapsed in timer.phases) == 2.0
+    assert timer.to_dict() == {"total_seconds": 2.0, "phases": {"imports": 0.5, "config": 0.25, "first_wait": 1.25}}
+
+
+def test_report_logs_each_phase_with_its_label(monkeypatch, caplog):
+    _fake_perf_counter(monkeypatch, [1.5, 2.0])
+    monkeypatch.setattr(startup_timing, "_resident_memory_bytes", lambda: None)
+    timer = StartupTimer(started=1.0)
+    timer.mark("config")
+    timer.mark("custom")
+
+    with caplog.at_level(logging.INFO):
+        timer.report()
+
+    assert caplog.messages == ["起動時間: 合計 1.000秒", "  設定ファイルの読み込み: 0.500秒", "  custom: 0.500秒"]
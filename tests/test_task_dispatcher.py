@@ -0,0 +1,125 @@
+# tests/test_task_dispatcher.py
+
+import threading
+from datetime import datetime, time as dt_time, timedelta
+
+from clock import VirtualClock
+from schedule_calculator import CompiledTask, Occurrence
+from task_dispatcher import TaskDispatcher, build_task_dispatcher
+
+TASK = CompiledTask(0, dt_time(8, 0), "run_exe", "task.exe", "/tmp/task.exe")
+TRACK = CompiledTask(1, dt_time(8, 0), "play_mp3", "chime.mp3", "/tmp/chime.mp3")
+SCHEDULED = datetime(2025, 6, 13, 8, 0)
+
+
+def _dispatcher(policy, now, calls):
+    def runner(occurrence):
+        calls.append(occurrence)
+        return True, "ok"
+
+    return TaskDispatcher(
+        {"run_exe": runner}, misfire_grace_seconds=60.0, misfire_policy=policy, clock=VirtualClock(now), inline=True
+    )
+
+
+def test_task_within_grace_is_executed_for_every_policy():
+    for policy in ("run_late", "skip", "coalesce"):
+        calls = []
+        record = _dispatcher(policy, SCHEDULED + timedelta(seconds=30), calls).submit(Occurrence(SCHEDULED, TASK)).result()
+
+        assert record.outcome == "executed"
+        assert record.lateness == 30.0
+        assert len(calls) == 1
+
+
+def test_run_late_executes_a_late_task():
+    calls = []
+    record = _dispatcher("run_late", SCHEDULED + timedelta(minutes=5), calls).submit(Occurrence(SCHEDULED, TASK)).result()
+
+    assert record.outcome == "executed"
+    assert len(calls) == 1
+
+
+def test_skip_does_not_run_a_late_task():
+    calls = []
+    record = _dispatcher("skip", SCHEDULED + timedelta(minutes=5), calls).submit(Occurrence(SCHEDULED, TASK)).result()
+
+    assert record.outcome == "skipped"
+    assert not record.success
+    assert calls == []
+
+
+def test_coalesce_runs_only_the_latest_late_occurrence():
+    calls = []
+    dispatcher = _dispatcher("coalesce", SCHEDULED + timedelta(days=1, minutes=5), calls)
+
+    # 後続の実行が登録済みの場合、遅れた前回分はそれに統合される
+    latest = dispatcher.submit(Occurrence(SCHEDULED + timedelta(days=1), TASK)).result()
+    earlier = dispatcher.submit(Occurrence(SCHEDULED, TASK)).result()
+
+    assert latest.outcome == "executed"
+    assert earlier.outcome == "coalesced"
+    assert [o.datetime for o in calls] == [SCHEDULED + timedelta(days=1)]
+
+
+def test_runner_exception_is_recorded_as_failure():
+    def runner(occurrence):
+        raise RuntimeError("boom")
+
+    dispatcher = TaskDispatcher({"run_exe": runner}, clock=VirtualClock(SCHEDULED), inline=True)
+
+    record = dispatcher.submit(Occurrence(SCHEDULED, TASK)).result()
+
+    assert record.outcome == "executed"
+    assert not record.success
+    assert "boom" in record.message
+
+
+def _blocking_player(started, release, both_started=None):
+    def runner(occurrence):
+        started.append(occurrence)
+        if both_started is not None and len(started) == 2:
+            both_started.set()
+        release.wait(5)
+        return True, "ok"
+
+    return runner
+
+
+def test_track_waiting_for_the_previous_one_misfires_when_it_starts_late():
+    clock = VirtualClock(SCHEDULED)
+    started, release = [], threading.Event()
+    config = {"executor": {"misfire_policy": "skip"}}
+    dispatcher = build_task_dispatcher(config, {"play_mp3": _blocking_player(started, release)}, clock=clock)
+    try:
+        first = dispatcher.submit(Occurrence(SCHEDULED, TRACK))
+        second = dispatcher.submit(Occurrence(SCHEDULED + timedelta(seconds=30), TRACK))
+        # 前の曲の再生中に猶予を過ぎた
+        clock.advance(300)
+        release.set()
+
+        assert first.result(5).outcome == "executed"
+        record = second.result(5)
+    finally:
+        release.set()
+        dispatcher.shutdown()
+
+    assert record.outcome == "skipped"
+    assert record.lateness == 270.0
+    assert len(started) == 1
+
+
+def test_preempt_overlap_policy_hands_the_next_track_over_without_waiting():
+    started, release, both_started = [], threading.Event(), threading.Event()
+    config = {"audio": {"overlap_policy": "preempt"}}
+    runners = {"play_mp3": _blocking_player(started, release, both_started)}
+    dispatcher = build_task_dispatcher(config, runners, clock=VirtualClock(SCHEDULED))
+    try:
+        futures = [dispatcher.submit(Occurrence(SCHEDULED + timedelta(seconds=s), TRACK)) for s in (0, 30)]
+
+        # 前の曲の再生中でも、次の曲はオーディオエンジンに渡される
+        assert both_started.wait(5)
+    finally:
+        release.set()
+        dispatcher.shutdown()
+    assert all(future.result(5).outcome == "executed" for future in futures)
@@ -0,0 +1,178 @@
+# tests/test_task_executor.py
+
+import os
+import stat
+import sys
+import threading
+import wave
+
+import pytest
+
+from task_executor import AudioEngine, ProcessSupervisor
+
+# 音声デバイスのない環境でもmixerを初期化できるようにする
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+def _write_silence(path, seconds):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(22050)
+        f.writeframes(b"\0\0" * int(22050 * seconds))
+    return str(path)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    pytest.importorskip("pygame")
+    engine = AudioEngine(poll_interval=0.01)
+    taken = []
+    take_staged = engine._take_staged
+
+    def record(file_path):
+        sound = take_staged(file_path)
+        taken.append((file_path, sound))
+        return sound
+
+    monkeypatch.setattr(engine, "_take_staged", record)
+    engine.taken = taken
+    yield engine
+    engine.shutdown(timeout=5)
+
+
+def test_queue_policy_plays_tracks_one_after_another(engine, tmp_path):
+    first = _write_silence(tmp_path / "first.wav", 0.2)
+    second = _write_silence(tmp_path / "second.wav", 0.1)
+    order = []
+
+    futures = [engine.play(path, on_start=lambda path=path: order.append(path), policy="queue") for path in (first, second)]
+
+    assert [future.result(timeout=5)[0] for future in futures] == [True, True]
+    assert order == [first, second]
+
+
+def test_preempt_policy_interrupts_the_playing_track(engine, tmp_path):
+    long_track = _write_silence(tmp_path / "long.wav", 5)
+    chime = _write_silence(tmp_path / "chime.wav", 0.1)
+    started = threading.Event()
+    interrupted = engine.play(long_track, on_start=started.set)
+    assert started.wait(5)
+
+    assert engine.play(chime, policy="preempt").result(timeout=5)[0]
+    assert interrupted.result(timeout=5) == (False, "再生が中断されました。")
+
+
+def test_play_of_a_missing_file_fails_without_starting_the_worker(engine, tmp_path):
+    success, message = engine.play(str(tmp_path / "missing.mp3")).result(timeout=5)
+
+    assert not success
+    assert "見つかりません" in message
+    assert engine._worker is None
+
+
+@pytest.mark.parametrize("policy", ["queue", "preempt"])
+def test_play_uses_the_sound_staged_for_the_same_file(engine, tmp_path, policy):
+    path = _write_silence(tmp_path / "chime.wav", 0.1)
+    assert engine.stage(path).result(timeout=5)[0]
+
+    assert engine.play(path, policy=policy).result(timeout=5)[0]
+
+    [(played_path, sound)] = engine.taken
+    assert played_path == path
+    assert sound is not None
+
+
+def test_preempt_keeps_a_queued_stage_for_the_file_to_play(engine, tmp_path):
+    long_track = _write_silence(tmp_path / "long.wav", 5)
+    chime = _write_silence(tmp_path / "chime.wav", 0.1)
+    started = threading.Event()
+    interrupted = engine.play(long_track, on_start=started.set)
+    assert started.wait(5)
+
+    # 再生中にキューに入った準備は、同じファイルのpreemptで取り消さない
+    staged = engine.stage(chime)
+    result = engine.play(chime, policy="preempt").result(timeout=5)
+
+    assert interrupted.result(timeout=5)[0] is False
+    assert staged.result(timeout=5)[0]
+    assert result[0]
+    assert engine.taken[-1][0] == chime and engine.taken[-1][1] is not None
+
+
+def test_preempt_releases_the_sound_staged_for_another_file(engine, tmp_path):
+    staged = _write_silence(tmp_path / "staged.wav", 0.1)
+    other = _write_silence(tmp_path / "other.wav", 0.1)
+    assert engine.stage(staged).result(timeout=5)[0]
+
+    assert engine.play(other, policy="preempt").result(timeout=5)[0]
+
+    assert engine._staged is None
+
+
+def test_stop_releases_the_staged_sound(engine, tmp_path):
+    path = _write_silence(tmp_path / "chime.wav", 0.1)
+    assert engine.stage(path).result(timeout=5)[0]
+
+    engine.stop()
+    # stop()が登録した解放処理の後に再生されるため、準備済みのSoundは使われない
+    assert engine.play(path).result(timeout=5)[0]
+
+    assert engine.taken[-1] == (path, None)
+
+
+def _write_script(path, body):
+    path.write_text(f"#!{sys.executable}\n{body}\n", encoding="utf-8")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+def _run_supervised(supervisor, file_path):
+    finished = threading.Event()
+    runs = []
+    supervisor.on_exit = lambda run: (runs.append(run), finished.set())
+
+    assert supervisor.launch(file_path)[0]
+    assert finished.wait(10)
+    return runs[0]
+
+
+@pytest.mark.skipif(not hasattr(os, "wait4"), reason="os.wait4()はPOSIXのみ")
+def test_supervisor_records_cpu_time_and_memory_from_wait4(tmp_path):
+    script = _write_script(
+        tmp_path / "burn.py", "import time\nend = time.process_time() + 0.3\nwhile time.process_time() < end:\n    pass"
+    )
+
+    run = _run_supervised(ProcessSupervisor(), script)
+
+    assert run.returncode == 0
+    assert not run.timed_out
+    assert run.cpu_seconds >= 0.25
+    assert run.peak_rss > 0
+
+
+def test_supervisor_kills_a_process_over_the_time_limit(tmp_path):
+    script = _write_script(tmp_path / "hang.py", "import time\ntime.sleep(30)")
+    supervisor = ProcessSupervisor(timeout_seconds=0.3)
+
+    run = _run_supervised(supervisor, script)
+
+    assert run.timed_out
+    assert run.returncode != 0
+    assert run.runtime < 5
+    assert supervisor.running_count() == 0
+    assert supervisor.recent_runs() == [run]
+
+
+def test_supervisor_refuses_to_launch_over_max_running(tmp_path):
+    script = _write_script(tmp_path / "hang.py", "import time\ntime.sleep(30)")
+    supervisor = ProcessSupervisor(max_running=1, timeout_seconds=1.0)
+    finished = threading.Event()
+    supervisor.on_exit = lambda run: finished.set()
+
+    assert supervisor.launch(script)[0]
+    success, message = supervisor.launch(script)
+
+    assert not success
+    assert "上限" in message
+    assert finished.wait(10)
@@ -0,0 +1,109 @@
+# tests/test_timer_queue.py
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from clock import VirtualClock
+from timer_queue import TimerQueue
+
+START = datetime(2025, 6, 13, 8, 0, 0)
+
+
+def test_wait_due_returns_items_in_time_order():
+    clock = VirtualClock(START)
+    timer = TimerQueue(clock=clock)
+    timer.add(START + timedelta(seconds=30), "c")
+    timer.add(START + timedelta(seconds=10), "a")
+    timer.add(START + timedelta(seconds=20), "b")
+
+    assert [item for _, item in timer.wait_due()] == ["a"]
+    assert clock.now() == START + timedelta(seconds=10)
+    assert [item for _, item in timer.wait_due()] == ["b"]
+    assert [item for _, item in timer.wait_due()] == ["c"]
+
+
+def test_wait_due_returns_all_items_due_at_the_same_time():
+    timer = TimerQueue(clock=VirtualClock(START))
+    when = START + timedelta(minutes=1)
+    timer.add(when, "first")
+    timer.add(when, "second")
+
+    assert timer.wait_due() == [(when, "first"), (when, "second")]
+
+
+def test_remove_and_remove_where_skip_cancelled_items():
+    timer = TimerQueue(clock=VirtualClock(START))
+    removed_id = timer.add(START + timedelta(seconds=1), "removed")
+    timer.add(START + timedelta(seconds=2), "dropped")
+    timer.add(START + timedelta(seconds=3), "kept")
+
+    assert timer.remove(removed_id)
+    assert not timer.remove(removed_id)
+    assert timer.remove_where(lambda when, item: item == "dropped") == 1
+    assert len(timer) == 1
+    assert timer.peek() == (START + timedelta(seconds=3), "kept")
+    assert [item for _, item in timer.wait_due()] == ["kept"]
+
+
+def test_add_wakes_a_waiting_thread():
+    timer = TimerQueue()
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(timer.wait_due()))
+    waiter.start()
+    time.sleep(0.1)
+
+    timer.add(datetime.now(), "now")
+    waiter.join(timeout=2.0)
+
+    assert not waiter.is_alive()
+    assert [item for _, item in results[0]] == ["now"]
+
+
+def test_remove_wakes_a_waiting_thread_to_recompute_the_deadline():
+    timer = TimerQueue()
+    far_id = timer.add(datetime.now() + timedelta(hours=1), "far")
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(timer.wait_due()))
+    waiter.start()
+    time.sleep(0.1)
+
+    timer.remove(far_id)
+    timer.add(datetime.now(), "near")
+    waiter.join(timeout=2.0)
+
+    assert not waiter.is_alive()
+    assert [item for _, item in results[0]] == ["near"]
+
+
+def test_shutdown_releases_a_waiting_thread():
+    timer = TimerQueue()
+    timer.add(datetime.now() + timedelta(hours=1), "far")
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(timer.wait_due()))
+    waiter.start()
+    time.sleep(0.1)
+
+    timer.shutdown()
+    waiter.join(timeout=2.0)
+
+    assert not waiter.is_alive()
+    assert results == [None]
+    assert timer.closed
+
+
+def test_wait_is_split_by_max_wait_seconds_unless_unbounded():
+    waits = {}
+    for max_wait in (600.0, None):
+        clock = VirtualClock(START)
+        timer = TimerQueue(max_wait_seconds=max_wait, clock=clock)
+        timer.add(START + timedelta(days=1), "tomorrow")
+        steps = []
+        original_wait = clock.wait
+        clock.wait = lambda condition, timeout: (steps.append(timeout), original_wait(condition, timeout))
+
+        assert [item for _, item in timer.wait_due()] == ["tomorrow"]
+        waits[max_wait] = steps
+
+    assert len(waits[600.0]) == 144
+    assert waits[None] == [86400.0]
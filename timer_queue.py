@@ -0,0 +1,175 @@
+# timer_queue.py
+
+import heapq
+import itertools
+import threading
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+from clock import SYSTEM_CLOCK
+
+
+class TimerQueue:
+    """
+    実行時刻順にイベントを保持するヒープベースのタイマーキュー。
+
+    wait_due()は次の期限までCondition上で待機し、期限が来たイベントを返す。
+    add()/remove()/clear()/shutdown()は待機中のスレッドを即座に起こすため、
+    タスクの追加・削除・再読込が次の期限を待たずに反映される。
+
+    削除は遅延方式で行う。ヒープ上の要素はそのまま残し、取り出し時に
+    登録表(_entries)に存在しないものを読み飛ばす。
+    """
+
+    def __init__(self, max_wait_seconds: Optional[float] = 600.0, clock=SYSTEM_CLOCK):
+        """
+        Args:
+            max_wait_seconds (float): 1回の待機の上限秒数。長時間の待機中に
+                システム時刻が修正された場合でも、この間隔で期限を再計算する。
+                Noneの場合は上限を設けない（時刻が修正されることのないVirtualClockで使用する）。
+            clock: 現在時刻の取得と待機に使う時計（SystemClock/VirtualClock）
+        """
+        self.clock = clock
+        self._heap: List[Tuple[datetime, int]] = []
+        self._entries: dict = {}
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._max_wait_seconds = max_wait_seconds
+
+    def add(self, when: datetime, item: Any) -> int:
+        """
+        イベントを登録し、待機中のスレッドを起こす。
+
+        Args:
+            when (datetime): 実行時刻
+            item (Any): 期限到達時にwait_due()が返す値
+
+        Returns:
+            int: remove()に渡すためのエントリID
+        """
+        with self._cond:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = (when, item)
+            heapq.heappush(self._heap, (when, entry_id))
+            self._cond.notify_all()
+            return entry_id
+
+    def remove(self, entry_id: int) -> bool:
+        """
+        登録済みのイベントを取り消す。
+
+        Returns:
+            bool: 取り消した場合True、既に実行済み・未登録の場合False
+        """
+        with self._cond:
+            if self._entries.pop(entry_id, None) is None:
+                return False
+            self._compact()
+            self._cond.notify_all()
+            return True
+
+    def remove_where(self, predicate: Callable[[datetime, Any], bool]) -> int:
+        """
+        条件に一致するイベントをまとめて取り消す。
+
+        Args:
+            predicate (Callable[[datetime, Any], bool]): (実行時刻, item)を受け取り、
+                取り消す場合にTrueを返す関数
+
+        Returns:
+            int: 取り消した件数
+        """
+        with self._cond:
+            removed = [entry_id for entry_id, (when, item) in self._entries.items() if predicate(when, item)]
+            for entry_id in removed:
+                del self._entries[entry_id]
+            if removed:
+                self._compact()
+                self._cond.notify_all()
+            return len(removed)
+
+    def clear(self):
+        """登録済みのイベントをすべて取り消す。"""
+        with self._cond:
+            self._entries.clear()
+            self._heap.clear()
+            self._cond.notify_all()
+
+    def wake(self):
+        """待機中のスレッドを起こし、次の期限を再計算させる。"""
+        with self._cond:
+            self._cond.notify_all()
+
+    def shutdown(self):
+        """キューを閉じる。待機中のwait_due()は直ちにNoneを返す。"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._entries)
+
+    def items(self) -> List[Tuple[datetime, Any]]:
+        """登録済みのイベントを(実行時刻, item)のリストとして時刻順に返す。"""
+        with self._cond:
+            return sorted(self._entries.values(), key=lambda x: x[0])
+
+    def peek(self) -> Optional[Tuple[datetime, Any]]:
+        """次に期限が来るイベントを返す。イベントがない場合はNone。"""
+        with self._cond:
+            self._discard_removed()
+            if not self._heap:
+                return None
+            return self._entries[self._heap[0][1]]
+
+    def wait_due(self) -> Optional[List[Tuple[datetime, Any]]]:
+        """
+        次の期限まで待機し、期限に達したイベントを時刻順に返す。
+
+        イベントが1件もない間は、追加されるかshutdown()されるまで待機する。
+
+        Returns:
+            list: [(実行時刻, item), ...]
+            None: shutdown()された場合
+        """
+        with self._cond:
+            while not self._closed:
+                self._discard_removed()
+                if not self._heap:
+                    self.clock.wait(self._cond, None)
+                    continue
+
+                now = self.clock.now()
+                if self._heap[0][0] <= now:
+                    due = []
+                    while self._heap and self._heap[0][0] <= now:
+                        _, entry_id = heapq.heappop(self._heap)
+                        entry = self._entries.pop(entry_id, None)
+                        if entry is not None:
+                            due.append(entry)
+                    if due:
+                        return due
+                    continue
+
+                timeout = (self._heap[0][0] - now).total_seconds()
+                if self._max_wait_seconds is not None:
+                    timeout = min(timeout, self._max_wait_seconds)
+                self.clock.wait(self._cond, timeout)
+            return None
+
+    def _discard_removed(self):
+        """取り消し済みのイベントをヒープの先頭から取り除く。ロック取得済みで呼ぶこと。"""
+        while self._heap and self._heap[0][1] not in self._entries:
+            heapq.heappop(self._heap)
+
+    def _compact(self):
+        """取り消し済みの要素がヒープの大半を占めたら作り直す。ロック取得済みで呼ぶこと。"""
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._entries):
+            self._heap = [(when, entry_id) for entry_id, (when, _) in self._entries.items()]
+            heapq.heapify(self._heap)